@@ -0,0 +1,70 @@
+import os
+import time
+import random
+import argparse
+
+from app.core.level import Level
+from app.pathing.grid import Grid
+from app.pathing.grid_cell import PASSABLE_CELL_COST
+from app.pathing.directions import ALL_DIRECTIONS
+
+LEVEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'level1')
+
+
+def load_grid(path) -> Grid:
+    return Level.load(path).create_grid()
+
+
+def random_pairs(grid, count, seed) -> list:
+    rng = random.Random(seed)
+    passable = [cell for cell in grid.iter_cells() if cell.is_passable]
+    return [(rng.choice(passable), rng.choice(passable)) for _ in range(count)]
+
+
+def chase_pairs(snapshot, chases, length, seed) -> list:
+    '''
+      Start and goal indices of `chases` chases of `length` plans each.
+      The goal walks away without turning back, the start takes a step
+      along the last path every other plan.
+    '''
+    rng = random.Random(seed)
+    n_directions = len(ALL_DIRECTIONS)
+    floor = [i for i, cost in enumerate(snapshot.costs) if cost == PASSABLE_CELL_COST]
+    pairs = []
+    for _ in range(chases):
+        start = rng.choice(floor)
+        goal = previous = rng.choice(floor)
+        for step in range(length):
+            pairs.append((start, goal))
+            path = snapshot.pathfind(start, goal)
+            if step % 2 and len(path) > 1:
+                start = path[1]
+            ways = [j for j in snapshot.links[goal * n_directions:(goal + 1) * n_directions]
+                    if j >= 0 and snapshot.costs[j] == PASSABLE_CELL_COST]
+            previous, goal = goal, rng.choice([j for j in ways if j != previous] or ways or [goal])
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grid.pathfind benchmark')
+    parser.add_argument('--level', default=LEVEL_PATH)
+    parser.add_argument('--pairs', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    grid = load_grid(args.level)
+    pairs = random_pairs(grid, args.pairs, args.seed)
+
+    started = time.perf_counter()
+    length = 0
+    for start, goal in pairs:
+        length += len(grid.pathfind(start, goal))
+    elapsed = time.perf_counter() - started
+
+    print(f'{len(pairs)} searches in {elapsed:.3f}s, '
+          f'{len(pairs) / elapsed:.0f} ops/sec, '
+          f'mean path length {length / len(pairs):.1f}')
+
+
+if __name__ == '__main__':
+    main()
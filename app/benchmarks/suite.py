@@ -0,0 +1,303 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+import pygame
+
+from app.core.clock import FRAME_RATE
+from app.core.asset_pack import AssetPack, open_assets
+from app.simulation.headless import HeadlessApp
+from app.simulation.batch import load_assets
+from app.scenes.game import Game
+from app.benchmarks.pathfind import load_grid, random_pairs, chase_pairs
+from app.pathing.flow_field import FlowField
+from app.pathing.incremental import IncrementalPlanner
+from app.pathing.routing_table import RoutingTable, UNREACHABLE
+
+APP_DIR = os.path.dirname(os.path.dirname(__file__))
+
+
+class Benchmark:
+    '''
+      Times `run` once per operation after `warmup` untimed runs.
+      `setup` prepares the state once, `prepare` is called untimed before every run.
+    '''
+    name = ''
+    needs_assets = False
+    warmup = 5
+
+    def __init__(self, options):
+        self.options = options
+
+    def setup(self):
+        pass
+
+    def prepare(self, i):
+        pass
+
+    def run(self, i):
+        raise NotImplementedError
+
+    def measure(self, operations) -> dict:
+        self.setup()
+        for i in range(self.warmup):
+            self.prepare(i)
+            self.run(i)
+
+        samples = []
+        for i in range(operations):
+            self.prepare(i)
+            started = time.perf_counter_ns()
+            self.run(i)
+            samples.append(time.perf_counter_ns() - started)
+        return summarize(samples)
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples) -> dict:
+    ordered = sorted(samples)
+    total = sum(ordered)
+    us = lambda ns: round(ns / 1000, 3)
+    return {
+        'operations': len(ordered),
+        'ops_per_sec': round(len(ordered) / (total / 1e9), 1) if total else None,
+        'mean_us': us(total / len(ordered)),
+        'min_us': us(ordered[0]),
+        'p50_us': us(percentile(ordered, 0.5)),
+        'p90_us': us(percentile(ordered, 0.9)),
+        'p99_us': us(percentile(ordered, 0.99)),
+        'max_us': us(ordered[-1])
+    }
+
+
+class PathfindRandom(Benchmark):
+    name = 'pathfind_random'
+
+    def setup(self):
+        self.grid = load_grid(self.options.level)
+        self.pairs = random_pairs(self.grid, 1024, self.options.seed)
+
+    def run(self, i):
+        self.grid.pathfind(*self.pairs[i % len(self.pairs)])
+
+
+class PathfindWorst(PathfindRandom):
+    name = 'pathfind_worst'
+
+    def setup(self):
+        self.grid = load_grid(self.options.level)
+        table = RoutingTable(self.grid).build()
+        passable = [i for i, cell in enumerate(table.cells) if cell.is_passable]
+        pairs = [(table.distance(table.cells[s], table.cells[g]), s, g)
+                 for s in passable for g in passable]
+        pairs = [pair for pair in pairs if pair[0] != UNREACHABLE]
+        pairs.sort(reverse=True)
+        self.pairs = [(table.cells[s], table.cells[g]) for _, s, g in pairs[:64]]
+
+
+class ChaseSearch(Benchmark):
+    '''
+      Plans again after every step of a goal walking away, with a
+      search from scratch each time.
+    '''
+    name = 'chase_search'
+    chase_length = 32
+
+    def setup(self):
+        self.snapshot = load_grid(self.options.level).freeze()
+        self.pairs = chase_pairs(self.snapshot, 64, self.chase_length, self.options.seed)
+
+    def run(self, i):
+        self.snapshot.pathfind(*self.pairs[i % len(self.pairs)])
+
+
+class ChaseIncremental(ChaseSearch):
+    '''
+      Same chases, with a planner kept from one plan to the next.
+    '''
+    name = 'chase_incremental'
+
+    def setup(self):
+        super().setup()
+        self.expanded = []
+
+    def prepare(self, i):
+        if i % self.chase_length == 0:
+            self.planner = IncrementalPlanner(self.snapshot)
+
+    def run(self, i):
+        self.planner.plan(*self.pairs[i % len(self.pairs)])
+        self.expanded.append(self.planner.expanded)
+
+    def measure(self, operations) -> dict:
+        result = super().measure(operations)
+        result['mean_expanded'] = round(sum(self.expanded) / len(self.expanded), 1)
+        return result
+
+
+class FlowFieldBuild(Benchmark):
+    '''
+      Builds the distances to a random goal over the whole level, what
+      every chasing ghost shares when Pacman enters another tile.
+    '''
+    name = 'flow_field_build'
+
+    def setup(self):
+        grid = load_grid(self.options.level)
+        self.field = FlowField(grid.freeze())
+        self.goals = [grid.index(goal.row, goal.col)
+                      for _, goal in random_pairs(grid, 1024, self.options.seed)]
+
+    def prepare(self, i):
+        self.field.goal = -1
+
+    def run(self, i):
+        self.field.update(self.goals[i % len(self.goals)])
+
+
+class GameBenchmark(Benchmark):
+    needs_assets = True
+
+    def new_game(self, screen=None):
+        app = HeadlessApp(load_assets(self.options.assets), screen)
+        game = app.new_game(self.options.level, self.options.seed)
+        game.step(FRAME_RATE * 2)  # past the start delay, ghosts are out
+        return game
+
+
+class GameFrame(GameBenchmark):
+    name = 'game_update_frame'
+
+    def setup(self):
+        self.game = self.new_game(pygame.Surface((608, 608)))
+        self.game.get_rendering_area()  # the first frame paints the whole screen
+        self.steer = random.Random(self.options.seed)
+        self.damaged_px = []
+
+    def prepare(self, i):
+        if self.game.app.scene is not self.game or self.game.pacman.dying:
+            self.setup()
+        if i % 20 == 0:
+            self.game.pacman.steer(self.steer.choice(['up', 'down', 'left', 'right']))
+
+    def run(self, i):
+        self.game.step(1)
+        self.game.get_rendering_area()
+        self.damaged_px.append(self.game.app.renderer.damaged_px)
+
+    def measure(self, operations) -> dict:
+        result = super().measure(operations)
+        result['mean_damaged_px'] = round(sum(self.damaged_px) / len(self.damaged_px))
+        return result
+
+
+class PacmanCollisions(GameBenchmark):
+    name = 'pacman_update'
+
+    def setup(self):
+        self.game = self.new_game()
+        self.pacman = self.game.pacman
+        self.pacman.steer('left')
+        self.game.step(1)
+
+    def prepare(self, i):
+        if self.pacman.dying:
+            self.setup()
+        self.pacman.set_pos(self.pacman.initial_pos)
+
+    def run(self, i):
+        self.pacman.update()
+
+
+class AssetsLoad(Benchmark):
+    name = 'assets_load'
+    needs_assets = True
+    warmup = 1
+
+    def run(self, i):
+        assets = open_assets(self.options.assets)
+        if isinstance(assets, AssetPack):
+            assets.close()
+        elif pygame.mixer.get_init():
+            for key in [key for key in assets if key.endswith('.wav')]:
+                assets[key] = pygame.mixer.Sound(assets[key])
+
+
+class LevelLoad(GameBenchmark):
+    name = 'level_load'
+    warmup = 1
+
+    def setup(self):
+        self.assets = load_assets(self.options.assets)
+
+    def prepare(self, i):
+        Game.templates.clear()  # time the level file, not the cached template
+
+    def run(self, i):
+        HeadlessApp(self.assets).new_game(self.options.level)
+
+
+benchmarks = [
+    PathfindRandom,
+    PathfindWorst,
+    ChaseSearch,
+    ChaseIncremental,
+    FlowFieldBuild,
+    GameFrame,
+    PacmanCollisions,
+    AssetsLoad,
+    LevelLoad
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='Engine hot path benchmarks')
+    parser.add_argument('--level', default=os.path.join(APP_DIR, 'level1'))
+    parser.add_argument('--assets', default=os.path.join(APP_DIR, 'assets'))
+    parser.add_argument('--operations', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='*', help='benchmark names to run')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    options = parser.parse_args()
+
+    try:
+        pygame.mixer.init()
+    except pygame.error:
+        pass
+
+    results = {}
+    for benchmark in benchmarks:
+        if options.only and benchmark.name not in options.only:
+            continue
+        if benchmark.needs_assets and not os.path.exists(options.assets):
+            results[benchmark.name] = {'skipped': 'no assets file'}
+            continue
+
+        operations = options.operations
+        if benchmark in (AssetsLoad, LevelLoad):
+            operations = max(1, operations // 100)
+        results[benchmark.name] = benchmark(options).measure(operations)
+
+    report = {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'seed': options.seed,
+        'results': results
+    }
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,15 @@
-import io
 import pygame
-import pickle
+from concurrent.futures import ThreadPoolExecutor
 
 from app.scenes.game import Game
+from app.core.clock import TickClock, use_clock, TICK_DURATION, RENDER_RATE, MAX_CATCH_UP, MAX_RENDER_SKIP
+from app.core.profiler import profile
+from app.core.audio import Audio, NullAudio
+from app.core.replay import Replay
+from app.core.records import Records
+from app.graphics.fonts import FontRegistry
+from app.graphics.renderer import Renderer
+from app.core.asset_pack import AssetPack, open_assets
 from app.scenes.menu import Menu
 from app.scenes.scores import Scores
 
@@ -12,68 +19,109 @@ class App:
         self.running = True
         self.screen = None
         self.scene = None
-        self.records = {}
+        self.profiler = None
+        self.records = None
+        self.audio = NullAudio()
+        self.fonts = None
+        self.renderer = None
+        self.path_workers = None
         self.assets = {}
         self.player = ''
         self.game = None
+        self.record_path = None
 
     def show_scene_(self, scene):
+        self.save_recording_()
         self.scene = scene
 
     def show_game(self):
+        # reset here rather than from the menu, so the game starts on the
+        # tick it is shown, the same way a replay of it starts
+        self.game.reset()
+        if self.record_path:
+            self.game.recording = Replay(self.game.level_name, self.game.seed)
         self.scene = self.game
 
     def show_menu(self):
-        self.game = Game(self)
+        if not self.game:
+            self.game = Game(self)
+            self.game.load()
         self.show_scene_(Menu(self))
-        self.game.load()
 
     def show_scores(self):
         self.show_scene_(Scores(self))
 
     def close(self):
-        if self.records:
-            with open('records', 'wb') as r:
-                pickle.dump(self.records, r)
         self.running = False
 
-    def music_update(self):
-        if pygame.mixer.music.get_busy():
-            if pygame.mixer.music.get_pos() > 224250:
-                pygame.mixer.music.stop()
-                pygame.mixer.music.play(1, 59.8)
+    def save_recording_(self):
+        if self.game and self.game.recording:
+            self.game.recording.save(self.record_path)
+            self.game.recording = None
 
     def launch(self):
         try:
-            with open('records', 'rb') as r:
-                self.records = pickle.load(r)
-        except:
-            self.records = {}
-
-        try:
-            with open('assets', 'rb') as a:
-                self.assets = pickle.load(a)
+            self.assets = open_assets('assets')
         except:
             return
 
-        sounds = [key for key in self.assets.keys() if key.endswith('.wav')]
-        for key in sounds:
-            self.assets[key] = pygame.mixer.Sound(self.assets[key])
+        self.records = Records('records.db', legacy_path='records')
+        self.fonts = FontRegistry(self.assets)
 
-        music_file_stream = io.BytesIO(self.assets['main_theme.mp3'])
-        pygame.mixer.music.load(music_file_stream, 'mp3')
-        pygame.mixer.music.set_volume(0.3)
-        pygame.mixer.music.play(-1)
+        if not isinstance(self.assets, AssetPack):  # legacy pickle, decode everything
+            sounds = [key for key in self.assets.keys() if key.endswith('.wav')]
+            for key in sounds:
+                self.assets[key] = pygame.mixer.Sound(self.assets[key])
+
+        if pygame.mixer.get_init():
+            self.audio = Audio(self.assets)
+        self.audio.play_music('main_theme.mp3')
 
         self.screen = pygame.display.set_mode((608, 608))
-        clock = pygame.time.Clock()
+        self.renderer = Renderer(self.screen)
+        self.path_workers = ThreadPoolExecutor(1, 'pathing')
+        game_clock = use_clock(TickClock())
+        frame_clock = pygame.time.Clock()
         self.show_menu()
 
+        # the game advances in fixed ticks of game time, as many per frame
+        # as the wall time spent requires, and frames that had to catch up
+        # are not drawn unless too many were skipped already
+        profiler = self.profiler
+        lag = 0
+        skipped = 0
         while self.running:
-            self.music_update()
-            self.screen.fill((0, 0, 0))
-            changes = self.scene.update()
-            pygame.display.update(changes)
-            clock.tick(40)
-
-        music_file_stream.close()
\ No newline at end of file
+            if profiler:
+                profiler.begin_frame()
+
+            scene = self.scene
+            scene.handle_events()
+            lag = min(lag + frame_clock.tick(RENDER_RATE), MAX_CATCH_UP * TICK_DURATION)
+            ticks = 0
+            while lag >= TICK_DURATION and self.scene is scene:
+                game_clock.advance(TICK_DURATION)
+                scene.simulate()
+                lag -= TICK_DURATION
+                ticks += 1
+
+            if ticks > 1 and skipped < MAX_RENDER_SKIP:
+                skipped += 1
+            else:
+                skipped = 0
+                changes = self.scene.render()
+                if profiler:
+                    changes = profiler.draw_overlay(self.screen, changes, self.game)
+                    self.renderer.damage(profiler.overlay)  # repaint under it next frame
+                with profile(profiler, 'display'):
+                    pygame.display.update(changes)
+            if profiler:
+                profiler.end_frame(self.game, ticks)
+
+        self.save_recording_()
+        self.path_workers.shutdown(cancel_futures=True)
+        if profiler:
+            profiler.close()
+        self.audio.close()
+        self.records.close()
+        if isinstance(self.assets, AssetPack):
+            self.assets.close()
\ No newline at end of file
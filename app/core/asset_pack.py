@@ -0,0 +1,143 @@
+import sys
+import mmap
+import json
+import pickle
+import struct
+import argparse
+from collections.abc import Mapping
+
+import pygame
+
+from app.graphics.animation import Animation
+from app.graphics.pickled_image import PickledImage
+
+IMAGE = 'image'
+ANIMATION = 'animation'
+SOUND = 'sound'
+BYTES = 'bytes'
+
+
+class AssetPack(Mapping):
+    '''
+      Read-only asset container: a header index of
+      name -> [offset, length, kind, meta] followed by raw payloads
+      (RGBA pixels for images and animation frames, file bytes otherwise).
+      The payloads are memory-mapped and each asset is decoded on first access.
+    '''
+    magic = b'PMAP'
+    version = 1
+    header = struct.Struct('<4sHI')
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = self.header.unpack_from(self.data)
+        if magic != self.magic or version != self.version:
+            self.close()
+            raise ValueError(f'{path} is not an asset pack')
+
+        start = self.header.size
+        self.index: dict[str, list] = json.loads(self.data[start:start + index_length])
+        self.cache = {}
+
+    def __getitem__(self, name):
+        if name in self.cache:
+            return self.cache[name]
+        offset, length, kind, meta = self.index[name]
+        asset = self.decode_(self.data[offset:offset + length], kind, meta)
+        self.cache[name] = asset
+        return asset
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def decode_(self, payload: bytes, kind, meta):
+        if kind == IMAGE:
+            return PickledImage(pygame.image.frombytes(payload, meta['size'], 'RGBA'))
+
+        if kind == ANIMATION:
+            width, height = meta['size']
+            frame_length = width * height * 4
+            frames = []
+            for i in range(meta['frames']):
+                pixels = payload[i * frame_length:(i + 1) * frame_length]
+                frames.append(pygame.image.frombytes(pixels, (width, height), 'RGBA'))
+            return Animation(frames, meta['delay'], meta['repeat'])
+
+        if kind == SOUND:
+            return pygame.mixer.Sound(payload)
+        return payload
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    @classmethod
+    def write(cls, path, assets: dict):
+        entries, payloads = {}, []
+        for name, asset in assets.items():
+            if isinstance(asset, PickledImage):
+                kind, meta = IMAGE, {'size': asset.image.get_size()}
+                payload = pygame.image.tobytes(asset.image, 'RGBA')
+            elif isinstance(asset, Animation):
+                kind = ANIMATION
+                meta = {
+                    'size': asset.frames[0].get_size(),
+                    'frames': len(asset.frames),
+                    'delay': asset.delay,
+                    'repeat': asset.repeat
+                }
+                payload = b''.join(pygame.image.tobytes(f, 'RGBA') for f in asset.frames)
+            elif name.endswith('.wav'):
+                kind, meta, payload = SOUND, {}, bytes(asset)
+            else:
+                kind, meta, payload = BYTES, {}, bytes(asset)
+            entries[name] = [kind, meta, len(payload)]
+            payloads.append(payload)
+
+        # offsets depend on the index length, so settle them first
+        offsets = {}
+        index = b''
+        while True:
+            offset = cls.header.size + len(index)
+            for name, (kind, meta, length) in entries.items():
+                offsets[name] = [offset, length, kind, meta]
+                offset += length
+            encoded = json.dumps(offsets).encode()
+            settled = len(encoded) == len(index)
+            index = encoded
+            if settled:
+                break
+
+        with open(path, 'wb') as pack:
+            pack.write(cls.header.pack(cls.magic, cls.version, len(index)))
+            pack.write(index)
+            for payload in payloads:
+                pack.write(payload)
+
+
+def open_assets(path) -> Mapping:
+    with open(path, 'rb') as a:
+        magic = a.read(len(AssetPack.magic))
+        if magic != AssetPack.magic:
+            a.seek(0)
+            return pickle.load(a)
+    return AssetPack(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert a pickled assets file to an asset pack')
+    parser.add_argument('source', help='pickled assets file')
+    parser.add_argument('target', help='asset pack to write, may be the source itself')
+    args = parser.parse_args()
+
+    with open(args.source, 'rb') as a:
+        assets = pickle.load(a)
+    AssetPack.write(args.target, assets)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import io
+import itertools
+
+import pygame
+
+MUSIC_END = pygame.event.custom_type()
+MUSIC_LOOP = pygame.event.custom_type()
+LOOP_START = 59800  # ms into the theme where the looped part starts
+LOOP_END = 224250  # and where it ends
+
+# a sound may take over a voice playing a sound of lower or equal priority
+priorities = {
+    'eating.wav': 0,
+    'ghosts_scared.wav': 1,
+    'eating_bonus.wav': 2,
+    'eating_ghosts.wav': 3,
+    'death.wav': 4
+}
+
+
+class Voice:
+    def __init__(self, channel_id):
+        self.channel = pygame.mixer.Channel(channel_id)
+        self.end_event = pygame.event.custom_type()
+        self.channel.set_endevent(self.end_event)
+        self.sound_id = None
+        self.sound = None
+        self.priority = 0
+        self.started = 0
+        self.pending = False  # play the same sound again when it ends
+        self.repeat = None  # called when the sound ends, True plays it again
+
+    def play(self, sound_id, sound, priority, started, repeat=None):
+        self.sound_id = sound_id
+        self.sound = sound
+        self.priority = priority
+        self.started = started
+        self.pending = False
+        self.repeat = repeat
+        self.channel.play(sound)
+
+    def release(self):
+        self.sound_id = None
+        self.sound = None
+        self.pending = False
+        self.repeat = None
+
+    def stop(self):
+        self.release()
+        self.channel.stop()
+
+
+class Audio:
+    '''
+      Sound effects on a fixed pool of reserved channels and the looping
+      theme, both driven by mixer end events handled by the scenes.
+      A sound goes to a free voice, or takes the voice of the oldest
+      sound of lowest priority not above its own, or is dropped.
+      Nothing reaches the mixer unless a sound starts or ends.
+    '''
+    def __init__(self, assets, voices=4):
+        pygame.mixer.set_reserved(voices)
+        self.assets = assets
+        self.voices = [Voice(i) for i in range(voices)]
+        self.by_event = dict((voice.end_event, voice) for voice in self.voices)
+        self.event_types = [MUSIC_END, MUSIC_LOOP] + list(self.by_event)
+        self.order = itertools.count(1)
+        self.music_stream = None
+
+    def find_voice_(self, sound_id):
+        for voice in self.voices:
+            if voice.sound_id == sound_id:
+                return voice
+        return None
+
+    def get_free_voice_(self, priority):
+        lowest = None
+        for voice in self.voices:
+            if voice.sound_id is None:
+                return voice
+            if voice.priority <= priority:
+                if lowest is None or (voice.priority, voice.started) < (lowest.priority, lowest.started):
+                    lowest = voice
+        return lowest
+
+    def play(self, sound_id, queued=False, repeat=None):
+        '''
+          queued: if the sound is playing already, play it once more
+            after it ends instead of starting it again now.
+          repeat: a callable asked at the end of every play, the sound
+            keeps looping while it returns True. Not restarted if playing.
+        '''
+        voice = self.find_voice_(sound_id)
+        if voice and queued:
+            voice.pending = True
+            return
+        if voice and repeat:
+            voice.repeat = repeat
+            return
+
+        priority = priorities.get(sound_id, 0)
+        voice = voice or self.get_free_voice_(priority)
+        if voice:
+            voice.play(sound_id, self.assets[sound_id], priority, next(self.order), repeat)
+
+    def stop(self):
+        for voice in self.voices:
+            if voice.sound_id:
+                voice.stop()
+
+    def play_music(self, name):
+        self.music_stream = io.BytesIO(self.assets[name])
+        pygame.mixer.music.load(self.music_stream, 'mp3')
+        pygame.mixer.music.set_volume(0.3)
+        pygame.mixer.music.set_endevent(MUSIC_END)
+        pygame.mixer.music.play()
+        pygame.time.set_timer(MUSIC_LOOP, LOOP_END, 1)
+
+    def loop_music_(self):
+        pygame.mixer.music.play(0, LOOP_START / 1000)
+        pygame.time.set_timer(MUSIC_LOOP, LOOP_END - LOOP_START, 1)
+
+    def react(self, app, event):
+        if event.type == MUSIC_LOOP:
+            self.loop_music_()
+        elif event.type == MUSIC_END:
+            if not pygame.mixer.music.get_busy():  # not the one replaced by loop_music_
+                self.loop_music_()
+        else:
+            voice = self.by_event[event.type]
+            if voice.sound_id is None or voice.channel.get_busy():
+                return  # stopped, or the end of a sound that was replaced
+            if voice.pending or (voice.repeat and voice.repeat()):
+                voice.pending = False
+                voice.channel.play(voice.sound)
+            else:
+                voice.release()
+
+    def close(self):
+        pygame.time.set_timer(MUSIC_LOOP, 0)
+        pygame.mixer.music.set_endevent()
+        pygame.mixer.music.stop()
+        if self.music_stream:
+            self.music_stream.close()
+
+
+class NullAudio:
+    '''
+      Stands in for Audio without a mixer, in headless games and replays.
+    '''
+    event_types = []
+
+    def play(self, sound_id, queued=False, repeat=None):
+        pass
+
+    def stop(self):
+        pass
+
+    def play_music(self, name):
+        pass
+
+    def react(self, app, event):
+        pass
+
+    def close(self):
+        pass
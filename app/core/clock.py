@@ -0,0 +1,40 @@
+import pygame
+
+FRAME_RATE = 40  # simulation ticks per second
+TICK_DURATION = 1000 // FRAME_RATE
+RENDER_RATE = 120  # upper bound on drawn frames per second
+MAX_CATCH_UP = 5  # ticks simulated in one frame at most, the rest is dropped
+MAX_RENDER_SKIP = 5  # frames skipped in a row at most while catching up
+
+
+class WallClock:
+    def get_ticks(self) -> int:
+        return pygame.time.get_ticks()
+
+
+class TickClock:
+    def __init__(self, ticks: int = 0):
+        self.ticks = ticks
+
+    def get_ticks(self) -> int:
+        return self.ticks
+
+    def advance(self, duration: int = TICK_DURATION):
+        self.ticks += duration
+
+
+clock = WallClock()
+
+
+def get_clock():
+    return clock
+
+
+def use_clock(new_clock):
+    global clock
+    clock = new_clock
+    return new_clock
+
+
+def get_ticks() -> int:
+    return clock.get_ticks()
@@ -1,7 +1,12 @@
 import pygame
+from pygame.locals import *
+
+from app.pathing.directions import key_to_direction
 
 
 class EventHandler:
+    allowed = None  # event types let through the queue by the last handler
+
     def __init__(self, app):
         self.observers = {}
         self.clear = self.observers.clear
@@ -14,7 +19,39 @@ class EventHandler:
             else:
                 self.observers[event_type] = [obs]
 
+    def allow_observed(self):
+        # blocking a type drops its queued events, so after the first
+        # call only the types that differ between scenes are switched
+        types = frozenset(self.observers) | {QUIT}
+        allowed = EventHandler.allowed
+        if allowed == types:
+            return
+
+        if allowed is None:
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed(list(types))
+        else:
+            if allowed - types:
+                pygame.event.set_blocked(list(allowed - types))
+            if types - allowed:
+                pygame.event.set_allowed(list(types - allowed))
+        EventHandler.allowed = types
+
+    def dispatch(self, event):
+        for obs in self.observers.get(event.type, ()):
+            obs.react(self.app, event)
+
     def handle(self):
-        for event in pygame.event.get():
-            for obs in self.observers.get(event.type, []):
-                obs.react(self.app, event)
+        # direction key repeats pile up between frames, only the latest
+        # press of each is dispatched, every event in the queue's order
+        self.allow_observed()
+        events = pygame.event.get()
+        latest = {}
+        for event in events:
+            if event.type == KEYDOWN and event.key in key_to_direction:
+                latest[event.key] = event
+
+        for event in events:
+            if event.type == KEYDOWN and latest.get(event.key, event) is not event:
+                continue
+            self.dispatch(event)
@@ -0,0 +1,227 @@
+import sys
+import mmap
+import struct
+import argparse
+from array import array
+
+from app.pathing.grid import Grid
+from app.pathing.directions import *
+from app.sprites.other import Wall, Door, Dot, Energizer
+from app.sprites.ghost import Ghost
+from app.sprites.pacman import Pacman
+from app.sprites.tunnel import Tunnel
+from app.core.pickled_sprite import PickledSprite
+from app.pathing.routing_table import RoutingTable
+from app.pathing.grid_cell import PASSABLE_CELL_COST, DOOR_CELL_COST, WALL_CELL_COST, IMPASSABLE_CELL_COST
+
+ROUTES = 1  # header flag, a routing table follows the entities
+
+tile_costs = {
+    '#': WALL_CELL_COST,
+    '-': DOOR_CELL_COST
+}
+
+tunnel_directions = {
+    '<': LEFT,
+    '>': RIGHT
+}
+
+entity_types = {
+    '.': (Dot, None),
+    'o': (Energizer, None),
+    'P': (Pacman, None),
+    'b': (Ghost, {'name': 'blinky'}),
+    'p': (Ghost, {'name': 'pinky'}),
+    'i': (Ghost, {'name': 'inky'}),
+    'c': (Ghost, {'name': 'clyde'})
+}
+
+static_types = {
+    WALL_CELL_COST: Wall,
+    DOOR_CELL_COST: Door
+}
+
+FLOOR = '_'
+VOID = ' '
+
+
+class Level:
+    '''
+      Compiled level: bordered cost grid and neighbor bitmasks laid out
+      like Grid.fill() expects them, tunnel links, entity spawns and
+      an optional routing table, all read from one mapped file.
+
+      Sources are ASCII mazes, one character per cell:
+        # wall, - door, _ floor, . dot, o energizer, P pacman,
+        b p i c ghosts, < > tunnels (paired by row, outermost first),
+        space for no cell. An '@origin row col' line moves the first character.
+    '''
+    magic = b'PMLV'
+    version = 1
+    header = struct.Struct('<4sHhhHHHIB')
+    tunnel = struct.Struct('<hhBhh')
+    entity = struct.Struct('<chh')
+
+    def __init__(self, top, left, height, width, costs: array, exits: bytes,
+                 tunnels: list, entities: list, routes: bytes = None):
+        self.top = top
+        self.left = left
+        self.height = height
+        self.width = width
+        self.costs = costs
+        self.exits = exits
+        self.tunnels = tunnels  # (row, col, direction, exit row, exit col)
+        self.entities = entities  # (tile character, row, col)
+        self.routes = routes
+
+    @classmethod
+    def parse(cls, text: str):
+        origin = (0, 0)
+        lines = []
+        for line in text.splitlines():
+            if line.startswith('@origin'):
+                _, row, col = line.split()
+                origin = (int(row), int(col))
+            else:
+                lines.append(line.rstrip())
+
+        tiles = {}
+        for row, line in enumerate(lines):
+            for col, char in enumerate(line):
+                if char == VOID:
+                    continue
+                if char not in tile_costs and char not in tunnel_directions \
+                        and char not in entity_types and char != FLOOR:
+                    raise ValueError(f'unknown tile {char!r} at line {row + 1}, column {col + 1}')
+                tiles[(row + origin[0], col + origin[1])] = char
+        if not tiles:
+            raise ValueError('the level has no cells')
+
+        rows = [row for row, _ in tiles]
+        cols = [col for _, col in tiles]
+        top = min(rows) - 1
+        left = min(cols) - 1
+        height = max(rows) - top + 2
+        width = max(cols) - left + 2
+
+        costs = array('H', [IMPASSABLE_CELL_COST]) * (width * height)
+        entities = []
+        for (row, col), char in sorted(tiles.items()):
+            costs[(row - top) * width + col - left] = tile_costs.get(char, PASSABLE_CELL_COST)
+            if char in entity_types:
+                entities.append((char, row, col))
+
+        tunnels = []
+        for row in sorted(set(rows)):
+            lefts = [col for (r, col), char in sorted(tiles.items()) if r == row and char == '<']
+            rights = [col for (r, col), char in sorted(tiles.items()) if r == row and char == '>']
+            if len(lefts) != len(rights):
+                raise ValueError(f'unpaired tunnel in row {row}')
+            for left_col, right_col in zip(lefts, reversed(rights)):
+                tunnels.append((row, left_col, LEFT, row, right_col))
+                tunnels.append((row, right_col, RIGHT, row, left_col))
+        tunnels.sort()
+
+        grid = Grid().fill(top, left, height, width, costs, tunnels)
+        return cls(top, left, height, width, costs, grid.exits, tunnels, entities)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as level_file:
+            with mmap.mmap(level_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                magic, version, top, left, height, width, n_tunnels, n_entities, flags = \
+                    cls.header.unpack_from(data)
+                if magic != cls.magic or version != cls.version:
+                    raise ValueError(f'{path} is not a compiled level')
+
+                size = width * height
+                offset = cls.header.size
+                costs = array('H')
+                costs.frombytes(data[offset:offset + size * costs.itemsize])
+                if sys.byteorder == 'big':
+                    costs.byteswap()
+                offset += size * costs.itemsize
+                exits = data[offset:offset + size]
+                offset += size
+
+                tunnels = []
+                for row, col, code, exit_row, exit_col in cls.tunnel.iter_unpack(
+                        data[offset:offset + n_tunnels * cls.tunnel.size]):
+                    tunnels.append((row, col, ALL_DIRECTIONS[code], exit_row, exit_col))
+                offset += n_tunnels * cls.tunnel.size
+
+                entities = []
+                for char, row, col in cls.entity.iter_unpack(
+                        data[offset:offset + n_entities * cls.entity.size]):
+                    entities.append((char.decode(), row, col))
+                offset += n_entities * cls.entity.size
+
+                routes = data[offset:] if flags & ROUTES else None
+
+        return cls(top, left, height, width, costs, exits, tunnels, entities, routes)
+
+    def save(self, path):
+        costs = array('H', self.costs)
+        if sys.byteorder == 'big':
+            costs.byteswap()
+
+        flags = ROUTES if self.routes else 0
+        with open(path, 'wb') as level_file:
+            level_file.write(self.header.pack(
+                self.magic, self.version, self.top, self.left, self.height, self.width,
+                len(self.tunnels), len(self.entities), flags))
+            level_file.write(costs.tobytes())
+            level_file.write(self.exits)
+            for row, col, direction, exit_row, exit_col in self.tunnels:
+                code = ALL_DIRECTIONS.index(direction)
+                level_file.write(self.tunnel.pack(row, col, code, exit_row, exit_col))
+            for char, row, col in self.entities:
+                level_file.write(self.entity.pack(char.encode(), row, col))
+            if self.routes:
+                level_file.write(self.routes)
+
+    def create_grid(self) -> Grid:
+        return Grid().fill(self.top, self.left, self.height, self.width,
+                           array('H', self.costs), self.tunnels, self.exits)
+
+    def create_router(self, grid):
+        if not self.routes:
+            return None
+        router = RoutingTable(grid)
+        return router if router.unpack(self.routes) else None
+
+    def build_routes(self):
+        self.routes = RoutingTable(self.create_grid()).build().pack()
+
+    def get_objects(self) -> list[PickledSprite]:
+        objects = []
+        for i, cost in enumerate(self.costs):
+            if cost in static_types:
+                row, col = divmod(i, self.width)
+                objects.append(PickledSprite(static_types[cost], row + self.top, col + self.left))
+        for char, row, col in self.entities:
+            cls, args = entity_types[char]
+            objects.append(PickledSprite(cls, row, col, dict(args) if args else None))
+        for row, col, direction, exit_row, exit_col in self.tunnels:
+            args = {'exit_cell': (exit_row, exit_col), 'direction': direction}
+            objects.append(PickledSprite(Tunnel, row, col, args))
+        return objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile an ASCII maze into a level file')
+    parser.add_argument('source', help='ASCII maze')
+    parser.add_argument('target', help='level file to write')
+    parser.add_argument('--routes', action='store_true',
+                        help='embed the all-pairs routing table')
+    args = parser.parse_args()
+
+    with open(args.source) as source:
+        level = Level.parse(source.read())
+    if args.routes:
+        level.build_routes()
+    level.save(args.target)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import csv
+import json
+import time
+from contextlib import nullcontext
+from collections import deque, defaultdict
+
+import pygame
+
+PHASES = ['sprites', 'events', 'timers', 'draw', 'overlay', 'display']
+no_profiling = nullcontext()
+
+
+def profile(profiler, name):
+    return profiler.phase(name) if profiler else no_profiling
+
+
+def covered_area(rects) -> int:
+    # pixels inside any of the rects, overlaps counted once
+    xs = sorted(set([rect.left for rect in rects] + [rect.right for rect in rects]))
+    area = 0
+    for left, right in zip(xs, xs[1:]):
+        spans = sorted((rect.top, rect.bottom) for rect in rects
+                       if rect.left <= left and rect.right >= right)
+        height = 0
+        top = bottom = None
+        for span_top, span_bottom in spans:
+            if bottom is None or span_top > bottom:
+                if bottom is not None:
+                    height += bottom - top
+                top, bottom = span_top, span_bottom
+            else:
+                bottom = max(bottom, span_bottom)
+        if bottom is not None:
+            height += bottom - top
+        area += height * (right - left)
+    return area
+
+
+class Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.started = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter_ns() - self.started
+        self.profiler.phases[self.name] += elapsed
+
+
+class FrameProfiler:
+    '''
+      Opt-in per-frame instrumentation of the main loop: phase timings,
+      per sprite class update time, pathfinding calls and dirty area.
+      Shows a rolling overlay and optionally dumps one record per frame
+      to a .csv or .jsonl file.
+    '''
+    def __init__(self, log_path=None, window=200):
+        self.frame_times = deque(maxlen=window)
+        self.phases = defaultdict(int)
+        self.sprite_classes = defaultdict(int)
+        self.pathfind_calls = 0
+        self.field_builds = 0
+        self.started = None
+        self.record = {}
+        self.font = None
+        self.overlay = None
+        self.frame = 0
+
+        self.log_file = None
+        self.log_writer = None
+        if log_path:
+            self.log_file = open(log_path, 'w', newline='')
+            if log_path.endswith('.csv'):
+                fields = ['frame', 'frame_ms', 'interval_ms', 'ticks', 'pathfind_calls', 'field_builds',
+                          'dirty_px', 'rects'] + PHASES + ['sprite_classes']
+                self.log_writer = csv.DictWriter(self.log_file, fields)
+                self.log_writer.writeheader()
+
+    def phase(self, name) -> Phase:
+        return Phase(self, name)
+
+    def begin_frame(self):
+        now = time.perf_counter_ns()
+        interval = now - self.started if self.started else 0
+        self.record = {'frame': self.frame, 'interval_ms': interval / 1e6}
+        self.phases.clear()
+        self.sprite_classes.clear()
+        self.started = now
+
+    def update_sprites(self, sprites):
+        for sprite in sprites.sprites():
+            started = time.perf_counter_ns()
+            sprite.update()
+            elapsed = time.perf_counter_ns() - started
+            self.sprite_classes[type(sprite).__name__] += elapsed
+
+    def count_pathfinding(self, game):
+        # searches and flow field builds since the last count, a new
+        # game starts both from zero again
+        calls = game.pathfind_calls if game else 0
+        builds = game.field_builds if game else 0
+        since = lambda count, last: count - last if count >= last else count
+        self.record['pathfind_calls'] = since(calls, self.pathfind_calls)
+        self.record['field_builds'] = since(builds, self.field_builds)
+        self.pathfind_calls = calls
+        self.field_builds = builds
+
+    def draw_overlay(self, screen, changes, game=None) -> list:
+        with self.phase('overlay'):
+            if isinstance(changes, pygame.Rect):
+                changes = [changes]
+            changes = list(changes)
+            self.record['rects'] = len(changes)
+            self.record['dirty_px'] = covered_area(changes)
+            self.count_pathfinding(game)
+
+            if self.font is None:
+                self.font = pygame.font.Font(None, 18)
+
+            ordered = sorted(self.frame_times)
+            p99 = ordered[int(len(ordered) * 0.99)] if ordered else 0
+            last = self.frame_times[-1] if ordered else 0
+            slowest = sorted(self.sprite_classes.items(), key=lambda i: -i[1])[:3]
+            lines = [
+                f'frame {last:.2f} ms  p99 {p99:.2f} ms',
+                f'pathfinding {self.record["pathfind_calls"]} calls, '
+                f'{self.record["field_builds"]} fields',
+                f'dirty {self.record["dirty_px"] / 1000:.1f} kpx in {len(changes)} rects'
+            ] + [f'{name} {ns / 1e6:.2f} ms' for name, ns in slowest]
+
+            images = [self.font.render(line, True, (255, 255, 0)) for line in lines]
+            width = max(image.get_width() for image in images) + 8
+            height = sum(image.get_height() for image in images) + 8
+            area = pygame.Rect(0, 0, width, height)
+            self.overlay = area
+            screen.fill((0, 0, 0), area)
+            y = 4
+            for image in images:
+                screen.blit(image, (4, y))
+                y += image.get_height()
+
+        changes.append(area)
+        return changes
+
+    def end_frame(self, game, ticks=1):
+        frame_time = (time.perf_counter_ns() - self.started) / 1e6
+        self.frame_times.append(frame_time)
+        self.record['frame_ms'] = frame_time
+        self.record['ticks'] = ticks
+        if 'pathfind_calls' not in self.record:  # nothing was drawn this frame
+            self.count_pathfinding(game)
+        self.frame += 1
+        if self.log_file:
+            self.write_record_()
+
+    def write_record_(self):
+        record = dict(self.record)
+        for name in PHASES:
+            record[name] = self.phases.get(name, 0) / 1e6
+        classes = dict((k, v / 1e6) for k, v in self.sprite_classes.items())
+
+        if self.log_writer:
+            record['sprite_classes'] = ';'.join(f'{k}={v:.4f}' for k, v in classes.items())
+            self.log_writer.writerow(record)
+        else:
+            record['sprite_classes'] = classes
+            self.log_file.write(json.dumps(record) + '\n')
+
+    def close(self):
+        if self.log_file:
+            self.log_file.close()
+            self.log_file = None
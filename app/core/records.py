@@ -0,0 +1,59 @@
+import os
+import pickle
+import sqlite3
+
+
+class Records:
+    '''
+      Best score per player in an sqlite database, indexed by score,
+      so new bests are stored as soon as they happen and the menu
+      reads the top of the table without sorting every player.
+    '''
+    def __init__(self, path='records.db', legacy_path='records'):
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS records ('
+                'name TEXT PRIMARY KEY, score INTEGER NOT NULL)')
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS records_by_score ON records (score DESC)')
+        if legacy_path and os.path.exists(legacy_path) and not len(self):
+            self.migrate_(legacy_path)
+
+    def migrate_(self, legacy_path):
+        # imports the pickled name -> score dict into a new database
+        try:
+            with open(legacy_path, 'rb') as r:
+                records = pickle.load(r)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+
+        for name, score in records.items():
+            self.submit_(name, score)
+        self.connection.commit()
+
+    def submit_(self, name, score):
+        self.connection.execute(
+            'INSERT INTO records (name, score) VALUES (?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET score = excluded.score '
+            'WHERE excluded.score > records.score', (name, score))
+
+    def submit(self, name, score):
+        with self.connection:
+            self.submit_(name, score)
+
+    def get(self, name, default=0) -> int:
+        row = self.connection.execute(
+            'SELECT score FROM records WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else default
+
+    def top(self, count) -> list[tuple[str, int]]:
+        return self.connection.execute(
+            'SELECT name, score FROM records ORDER BY score DESC, rowid LIMIT ?',
+            (count,)).fetchall()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def close(self):
+        self.connection.close()
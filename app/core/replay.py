@@ -0,0 +1,87 @@
+import sys
+import zlib
+import struct
+from array import array
+
+from app.pathing.directions import ALL_DIRECTIONS
+from app.sprites.other import Dot
+
+
+def state_hash(game) -> int:
+    # crc32 of what a player can see change: scores, lives, dots left,
+    # and where Pacman and the ghosts are and what they are doing
+    pacman = game.pacman
+    state = [game.score, game.lives, game.bonus, len(game.get_sprites_of_class(Dot)),
+             pacman.rect.topleft, pacman.direction]
+    for ghost in game.ghosts.values():
+        state.append((ghost.rect.topleft, ghost.direction, ghost.mode.mode, ghost.action.action))
+    return zlib.crc32(repr(state).encode())
+
+
+class Replay:
+    '''
+      Seed and level of one game, Pacman's pending turn at the start
+      of every tick and the state hash after it. Played back headless
+      from the same seed, a game must hash the same on every tick.
+
+      File: header, level name, then the zlib compressed input codes
+      (one byte per tick, 0 for no turn) followed by the hashes.
+    '''
+    magic = b'PMRP'
+    version = 2
+    header = struct.Struct('<4sHqIH')
+    old_headers = {1: struct.Struct('<4sHIIH')}  # version 1 stored the seed unsigned in 32 bits
+
+    def __init__(self, level_name, seed, inputs: bytearray = None, hashes: array = None):
+        if not -1 << 63 <= seed < 1 << 63:
+            raise ValueError(f'seed {seed} does not fit in a replay')
+        self.level_name = level_name
+        self.seed = seed
+        self.inputs = inputs if inputs is not None else bytearray()
+        self.hashes = hashes if hashes is not None else array('I')
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, game, direction):
+        self.inputs.append(ALL_DIRECTIONS.index(direction) + 1 if direction else 0)
+        self.hashes.append(state_hash(game))
+
+    def get_direction(self, tick):
+        code = self.inputs[tick]
+        return ALL_DIRECTIONS[code - 1] if code else None
+
+    def save(self, path):
+        hashes = array('I', self.hashes)
+        if sys.byteorder == 'big':
+            hashes.byteswap()
+
+        name = self.level_name.encode()
+        with open(path, 'wb') as replay_file:
+            replay_file.write(self.header.pack(
+                self.magic, self.version, self.seed, len(self), len(name)))
+            replay_file.write(name)
+            replay_file.write(zlib.compress(bytes(self.inputs) + hashes.tobytes(), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as replay_file:
+            data = replay_file.read()
+
+        magic, version = struct.unpack_from('<4sH', data)
+        header = cls.header if version == cls.version else cls.old_headers.get(version)
+        if magic != cls.magic or header is None:
+            raise ValueError(f'{path} is not a replay')
+
+        _, _, seed, ticks, name_size = header.unpack_from(data)
+        offset = header.size
+        level_name = data[offset:offset + name_size].decode()
+        body = zlib.decompress(data[offset + name_size:])
+
+        hashes = array('I')
+        hashes.frombytes(body[ticks:])
+        if sys.byteorder == 'big':
+            hashes.byteswap()
+        if len(hashes) != ticks:
+            raise ValueError(f'{path} is truncated')
+        return cls(level_name, seed, bytearray(body[:ticks]), hashes)
@@ -0,0 +1,49 @@
+import heapq
+import itertools
+
+from app.core import clock
+from app.core.timer import Timer
+
+
+class Scheduler:
+    '''
+      Timers in a min-heap keyed on deadline. Cancelling only flags the
+      Timer, the entry is dropped when it reaches the top of the heap,
+      so update() costs O(log n) per timer that fires or was cancelled.
+    '''
+    def __init__(self):
+        self.queue: list[tuple[int, int, Timer]] = []
+        self.order = itertools.count()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def push_(self, timer: Timer) -> Timer:
+        heapq.heappush(self.queue, (timer.deadline, next(self.order), timer))
+        return timer
+
+    def after_delay(self, duration, action) -> Timer:
+        return self.push_(Timer(duration, action))
+
+    def every(self, period, action) -> Timer:
+        return self.push_(Timer(period, action, period))
+
+    def clear(self):
+        for _, _, timer in self.queue:
+            timer.cancel()
+        self.queue.clear()
+
+    def update(self):
+        time = clock.get_ticks()
+        queue = self.queue
+        while queue and queue[0][0] <= time:
+            _, _, timer = heapq.heappop(queue)
+            if not timer.active:
+                continue
+
+            if timer.period:
+                timer.deadline += timer.period
+                self.push_(timer)
+            else:
+                timer.active = False
+            timer.action()
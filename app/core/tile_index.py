@@ -0,0 +1,50 @@
+class TileIndex:
+    '''
+      Maps each tile to the sprites whose centre lies in it,
+      so collision checks only look at the tiles around a rect.
+      Sprites of a tile are kept in the order they entered it, not
+      by their ids, so a replayed game meets them in the same order.
+    '''
+    def __init__(self, tilesize: int):
+        self.tilesize = tilesize
+        self.tiles: dict[tuple[int, int], dict] = {}
+        self.keys = {}
+
+    def get_key_(self, sprite) -> tuple[int, int]:
+        x, y = sprite.rect.center
+        return x // self.tilesize, y // self.tilesize
+
+    def add(self, sprite):
+        key = self.get_key_(sprite)
+        if key in self.tiles:
+            self.tiles[key][sprite] = None
+        else:
+            self.tiles[key] = {sprite: None}
+        self.keys[sprite] = key
+        sprite.tile_index = self
+
+    def remove(self, sprite):
+        key = self.keys.pop(sprite, None)
+        if key is not None:
+            self.tiles[key].pop(sprite, None)
+        sprite.tile_index = None
+
+    def move(self, sprite):
+        key = self.get_key_(sprite)
+        if self.keys.get(sprite) != key:
+            self.remove(sprite)
+            self.add(sprite)
+
+    def clear(self):
+        for sprite in self.keys:
+            sprite.tile_index = None
+        self.tiles.clear()
+        self.keys.clear()
+
+    def query(self, rect) -> list:
+        sprites = []
+        tsize = self.tilesize
+        for col in range(rect.left // tsize, (rect.right - 1) // tsize + 1):
+            for row in range(rect.top // tsize, (rect.bottom - 1) // tsize + 1):
+                sprites.extend(self.tiles.get((col, row), ()))
+        return sprites
@@ -1,17 +1,14 @@
-import pygame
+from app.core import clock
 
 
 class Timer:
-    def __init__(self, duration, action):
-        self.start = pygame.time.get_ticks()
+    def __init__(self, duration, action, period=None):
+        self.start = clock.get_ticks()
+        self.deadline = self.start + duration
         self.duration = duration
+        self.period = period
         self.action = action
         self.active = True
 
-    def update(self):
-        if self.active:
-            time = pygame.time.get_ticks()
-            if time - self.start >= self.duration:
-                self.active = False
-                self.action()
-        return self
+    def cancel(self):
+        self.active = False
@@ -1,14 +1,16 @@
-from app.core.timer import Timer
+from app.core import clock
 from app.graphics.pickled_image import PickledImage
 
 
 class Animation:
+    '''
+      Frame strip shared by every sprite that plays it, never modified
+      after loading. Playback state lives in AnimationPlayer.
+    '''
     def __init__(self, frames, delay, repeat = True):
         self.frames = frames
         self.repeat = repeat
         self.delay = delay
-        self.timer = None
-        self.frame = 0
 
     def __getstate__(self):
         state = self.__dict__.copy()
@@ -16,25 +18,42 @@ class Animation:
         return state
 
     def __setstate__(self, state):
+        state.pop('timer', None)  # playback state of older pickles
+        state.pop('frame', None)
         self.__dict__.update(state)
         self.frames = [f.image for f in self.frames]
 
+    def get_frame_index(self, elapsed: int) -> int:
+        frame = elapsed // self.delay
+        if self.repeat:
+            return frame % len(self.frames)
+        return min(frame, len(self.frames) - 1)
+
+
+class AnimationPlayer:
+    def __init__(self):
+        self.animation = None
+        self.start = 0
+        self.frame = 0
+
+    @property
+    def playing(self):
+        return self.animation is not None
+
     @property
     def finished(self):
-        return self.frame + 1 == len(self.frames)
+        return self.frame + 1 == len(self.animation.frames)
 
-    def rewind(self):
-        self.timer = None
+    def play(self, animation: Animation):
+        self.animation = animation
+        self.start = clock.get_ticks()
         self.frame = 0
 
-    def next_frame(self):
-        if self.repeat or not self.finished:
-            self.timer = Timer(self.delay, self.next_frame)
-            self.frame = 0 if self.finished else self.frame + 1
+    def stop(self):
+        self.animation = None
+        self.frame = 0
 
     def update(self):
-        if self.timer:
-            self.timer.update()
-        else:
-            self.timer = Timer(self.delay, self.next_frame)
-        return self.frames[self.frame]
+        elapsed = clock.get_ticks() - self.start
+        self.frame = self.animation.get_frame_index(elapsed)
+        return self.animation.frames[self.frame]
@@ -0,0 +1,54 @@
+from io import BytesIO
+from collections import OrderedDict
+
+import pygame
+
+
+class CachedFont:
+    '''
+      Stands in for pygame.font.Font, rendering through the registry cache.
+    '''
+    def __init__(self, registry, name, size):
+        self.stream = BytesIO(registry.assets[name])  # read by the font while it lives
+        self.font = pygame.font.Font(self.stream, size)
+        self.registry = registry
+        self.name = name
+        self.size = size
+
+    def render(self, text, antialias, color) -> pygame.Surface:
+        key = (self.name, self.size, text, tuple(color), antialias)
+        image = self.registry.get_text_(key)
+        if image is None:
+            image = self.registry.put_text_(key, self.font.render(text, antialias, color))
+        return image
+
+
+class FontRegistry:
+    '''
+      Fonts loaded once per (font, size) for the whole app, plus
+      a least recently used cache of rendered text surfaces.
+    '''
+    def __init__(self, assets, capacity=512):
+        self.assets = assets
+        self.capacity = capacity
+        self.fonts: dict[tuple[str, int], CachedFont] = {}
+        self.texts: OrderedDict = OrderedDict()
+
+    def get(self, name, size) -> CachedFont:
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = CachedFont(self, name, size)
+            self.fonts[(name, size)] = font
+        return font
+
+    def get_text_(self, key):
+        image = self.texts.get(key)
+        if image is not None:
+            self.texts.move_to_end(key)
+        return image
+
+    def put_text_(self, key, image) -> pygame.Surface:
+        self.texts[key] = image
+        if len(self.texts) > self.capacity:
+            self.texts.popitem(last=False)
+        return image
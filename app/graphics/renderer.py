@@ -0,0 +1,90 @@
+import pygame
+
+
+def merge_rects(rects) -> list[pygame.Rect]:
+    # overlapping or touching rects become their union, repeated until
+    # no two of the remaining rects touch
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        while True:
+            i = rect.inflate(2, 2).collidelist(merged)
+            if i < 0:
+                break
+            rect.union_ip(merged.pop(i))
+        merged.append(rect)
+    return merged
+
+
+class Renderer:
+    '''
+      Draws a sprite group by damage: a sprite whose image, position or
+      visibility changed since the last frame damages its old and new
+      areas, the merged damaged areas are restored from the background
+      and every sprite overlapping them is drawn again, clipped.
+      Switching to another group or background repaints the screen.
+    '''
+    def __init__(self, screen):
+        self.screen = screen
+        self.sprites = None
+        self.background = None
+        self.drawn = {}  # sprite -> (image, area) as last drawn
+        self.damaged = []  # areas drawn over from outside the renderer
+        self.damaged_px = 0
+        self.redrawn = 0
+
+    def damage(self, rect):
+        self.damaged.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        self.damaged.append(self.screen.get_rect())
+
+    def draw(self, sprites, background=None) -> list[pygame.Rect]:
+        if sprites is not self.sprites or background is not self.background:
+            self.sprites = sprites
+            self.background = background
+            self.invalidate()
+
+        damaged, self.damaged = self.damaged, []
+        drawn = {}
+        visible = []
+        areas = []
+        for sprite in sprites.sprites():
+            if not getattr(sprite, 'visible', True):
+                continue
+            image = sprite.image
+            area = pygame.Rect(sprite.rect.topleft, image.get_size())
+            last = self.drawn.pop(sprite, None)
+            if last is None or last[0] is not image or last[1] != area:
+                damaged.append(area)
+                if last:
+                    damaged.append(last[1])
+            drawn[sprite] = (image, area)
+            visible.append(image)
+            areas.append(area)
+
+        for _, area in self.drawn.values():  # removed or hidden
+            damaged.append(area)
+        self.drawn = drawn
+
+        screen = self.screen
+        bounds = screen.get_rect()
+        changes = []
+        self.redrawn = 0
+        for rect in merge_rects(damaged):
+            rect = rect.clip(bounds)
+            if not rect:
+                continue
+            if self.background is not None:
+                screen.blit(self.background, rect, rect)
+            else:
+                screen.fill((0, 0, 0), rect)
+            for i in rect.collidelistall(areas):
+                area = areas[i]
+                clipped = rect.clip(area)
+                screen.blit(visible[i], clipped, clipped.move(-area.x, -area.y))
+                self.redrawn += 1
+            changes.append(rect)
+
+        self.damaged_px = sum(rect.w * rect.h for rect in changes)
+        return changes
@@ -1,22 +1,38 @@
 # etofamiliya, 2017-2025
 
 import os.path
+import argparse
 import contextlib
 
 with contextlib.redirect_stdout(None):
     import pygame.gfxdraw
 
 from core.app import App
+from core.clock import TICK_DURATION
+from core.profiler import FrameProfiler
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pacman')
+    parser.add_argument('--profile', action='store_true',
+                        help='show frame timings over the game')
+    parser.add_argument('--profile-log', metavar='FILE',
+                        help='also write one record per frame to a .csv or .jsonl file')
+    parser.add_argument('--record', metavar='FILE',
+                        help='save a replay of the last game played')
+    args = parser.parse_args()
+
     pygame.init()
     pygame.mixer.init()
-    pygame.key.set_repeat(150, 1)
+    pygame.key.set_repeat(150, TICK_DURATION)
     pygame.mouse.set_visible(False)
     pygame.display.set_caption('Pacman')
     os.environ["SDL_VIDEO_CENTERED"] = '1'
 
-    App().launch()
+    app = App()
+    if args.profile or args.profile_log:
+        app.profiler = FrameProfiler(args.profile_log)
+    app.record_path = args.record
+    app.launch()
 
     pygame.mixer.quit()
     pygame.quit()
\ No newline at end of file
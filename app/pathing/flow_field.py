@@ -0,0 +1,91 @@
+from array import array
+
+from app.pathing.directions import ALL_DIRECTIONS
+from app.pathing.grid_cell import IMPASSABLE_CELL_COST
+from app.pathing.routing_table import UNREACHABLE
+
+
+class FlowField:
+    '''
+      Cost of the cheapest way from every cell of a GridSnapshot to one
+      goal cell, shared by everything heading for that goal: from any
+      cell, the next step is the neighbor closest to the goal.
+
+      Built with Dial's buckets, a breadth first search that also
+      handles the costs of doors and walls: cells are taken by distance
+      from a ring of top cost + 1 buckets, one pass over the cells and
+      their links with no heap.
+    '''
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        costs = snapshot.costs
+        n_directions = len(ALL_DIRECTIONS)
+        self.distances = array('I', [UNREACHABLE]) * len(costs)
+        self.goal = -1
+        self.builds = 0
+
+        # cells stepping into each cell, impassable ones left out
+        self.sources = [[] for _ in costs]
+        for n, j in enumerate(snapshot.links):
+            i = n // n_directions
+            if j >= 0 and costs[i] != IMPASSABLE_CELL_COST and costs[j] != IMPASSABLE_CELL_COST:
+                self.sources[j].append(i)
+        self.top_cost = max([cost for cost in costs if cost != IMPASSABLE_CELL_COST], default=1)
+
+    def update(self, goal: int) -> bool:
+        '''
+          Builds the field again if the goal moved, returns whether it did.
+        '''
+        if goal == self.goal:
+            return False
+
+        costs = self.snapshot.costs
+        sources = self.sources
+        distances = array('I', [UNREACHABLE]) * len(costs)
+        buckets = [[] for _ in range(self.top_cost + 1)]
+
+        distances[goal] = 0
+        buckets[0].append(goal)
+        pending = 1
+        distance = 0
+        while pending:
+            bucket = buckets[distance % len(buckets)]
+            while bucket:
+                i = bucket.pop()
+                pending -= 1
+                if distances[i] != distance:
+                    continue  # reached again by a cheaper way since
+
+                step = distance + costs[i]
+                for j in sources[i]:
+                    if step < distances[j]:
+                        distances[j] = step
+                        buckets[step % len(buckets)].append(j)
+                        pending += 1
+            distance += 1
+
+        self.distances = distances
+        self.goal = goal
+        self.builds += 1
+        return True
+
+    def next_cell(self, i: int) -> int:
+        '''
+          Neighbor of cell i on a cheapest way to the goal, first in
+          ALL_DIRECTIONS order on ties. -1 at the goal or out of its reach.
+        '''
+        if i == self.goal or self.distances[i] == UNREACHABLE:
+            return -1
+
+        costs = self.snapshot.costs
+        n_directions = len(ALL_DIRECTIONS)
+        best = UNREACHABLE
+        step = -1
+        for j in self.snapshot.links[i * n_directions:(i + 1) * n_directions]:
+            if j < 0 or self.distances[j] == UNREACHABLE:
+                continue
+            distance = costs[j] + self.distances[j]
+            if distance < best:
+                best = distance
+                step = j
+        return step
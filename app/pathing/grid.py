@@ -1,24 +1,217 @@
+import heapq
+import itertools
 import threading
+from array import array
 from typing import Union
 
 from app.pathing.directions import *
-from app.pathing.grid_cell import GridCell
+from app.pathing.snapshot import GridSnapshot
+from app.pathing.grid_cell import GridCell, PASSABLE_CELL_COST, IMPASSABLE_CELL_COST, IMPASSABLE_CELL
+
+offsets = {
+    UP: (-1, 0),
+    DOWN: (1, 0),
+    LEFT: (0, -1),
+    RIGHT: (0, 1)
+}
 
 
 class Grid:
     def __init__(self):
         self.cells: dict[str, GridCell] = {}
         self.pathing_lock = threading.Lock()
+        self.generation = 0
+
+        # dense storage, filled by pack() or fill()
+        self.packed = False
+        self.top = 0
+        self.left = 0
+        self.width = 0
+        self.height = 0
+        self.costs = None
+        self.links = None
+        self.exits = None
+        self.slots = None
+        self.snapshot = None
 
     def set(self, row, col, cost: int, neighbors: dict = None):
-        key = f'{row} {col}'
-        self.cells[key] = GridCell(row, col, cost, neighbors)
+        cell = GridCell(row, col, cost, neighbors)
+        if not self.packed:
+            self.cells[f'{row} {col}'] = cell
+            return
+
+        i = self.index(row, col)
+        if 0 < row - self.top < self.height - 1 and 0 < col - self.left < self.width - 1:
+            self.set_packed_(i, cell)
+        else:
+            # on or past the border, the arrays have to grow
+            self.unpack_()
+            self.cells[f'{row} {col}'] = cell
+            self.pack()
+
+    def set_packed_(self, i, cell: GridCell):
+        # replaces one cell in the arrays, its links, and the exits and
+        # cached neighbors of the cells around it
+        n_directions = len(ALL_DIRECTIONS)
+        self.cells[f'{cell.row} {cell.col}'] = cell
+        self.costs[i] = cell.cost
+        self.slots[i] = cell
+        self.snapshot = None
+
+        for code, direction in enumerate(ALL_DIRECTIONS):
+            d_row, d_col = offsets[direction]
+            target = cell.neighbors.get(direction)
+            if target is None:
+                j = self.index(cell.row + d_row, cell.col + d_col)
+            else:
+                j = self.index(target.row, target.col)
+            self.links[i * n_directions + code] = j
+
+        sources = [n // n_directions for n, j in enumerate(self.links) if j == i]
+        for k in set(sources + [i]):
+            exits = 0
+            for code in range(n_directions):
+                j = self.links[k * n_directions + code]
+                if j >= 0 and self.costs[j] <= PASSABLE_CELL_COST:
+                    exits |= 1 << code
+            self.exits[k] = exits
+
+            source = self.slots[k]
+            if source is not None and source is not cell:
+                for direction, neighbor in list(source.neighbors.items()):
+                    if neighbor == cell and neighbor is not cell:
+                        del source.neighbors[direction]
 
     def get(self, row, col) -> GridCell:
-        key = f'{row} {col}'
-        return self.cells.get(key, GridCell.impassable_at(row, col))
+        if self.packed:
+            return self.get_packed_(row, col)
+        return self.cells.get(f'{row} {col}', IMPASSABLE_CELL)
+
+    def iter_cells(self):
+        if not self.packed:
+            yield from self.cells.values()
+            return
+        for i, cost in enumerate(self.costs):
+            if cost != IMPASSABLE_CELL_COST:
+                yield self.slots[i] or self.cell_at(i)
+
+    def pack(self):
+        '''
+          Switches lookups to flat arrays indexed by row * width + col
+          (relative to the top left corner), keeping an impassable border
+          around the cells, so every neighbor of a stored cell has a slot.
+        '''
+        rows = [cell.row for cell in self.cells.values()]
+        cols = [cell.col for cell in self.cells.values()]
+        top = min(rows) - 1
+        left = min(cols) - 1
+        height = max(rows) - top + 2
+        width = max(cols) - left + 2
+
+        costs = array('H', [IMPASSABLE_CELL_COST]) * (width * height)
+        tunnels = []
+        for cell in self.cells.values():
+            costs[(cell.row - top) * width + cell.col - left] = cell.cost
+            for direction, target in cell.neighbors.items():
+                d_row, d_col = offsets[direction]
+                if target is not IMPASSABLE_CELL and \
+                        (target.row, target.col) != (cell.row + d_row, cell.col + d_col):
+                    tunnels.append((cell.row, cell.col, direction, target.row, target.col))
+
+        self.fill(top, left, height, width, costs, tunnels)
+        for cell in self.cells.values():
+            self.slots[self.index(cell.row, cell.col)] = cell
+        return self
+
+    def fill(self, top, left, height, width, costs: array, tunnels: list, exits: bytes = None):
+        '''
+          Loads the dense storage directly: costs covers the bordered area
+          row by row, tunnels are (row, col, direction, exit row, exit col)
+          links replacing the adjacent cell, exits holds a bit per passable
+          neighbor (in ALL_DIRECTIONS order) and is derived when missing.
+        '''
+        self.top = top
+        self.left = left
+        self.height = height
+        self.width = width
+        self.snapshot = None
+
+        size = width * height
+        self.costs = costs
+        self.slots: list[Union[GridCell, None]] = [None] * size
+
+        self.links = array('i', [-1]) * (size * len(ALL_DIRECTIONS))
+        for i in range(size):
+            row, col = self.position(i)
+            for code, direction in enumerate(ALL_DIRECTIONS):
+                d_row, d_col = offsets[direction]
+                self.links[i * len(ALL_DIRECTIONS) + code] = self.index(row + d_row, col + d_col)
+        for row, col, direction, exit_row, exit_col in tunnels:
+            code = ALL_DIRECTIONS.index(direction)
+            i = self.index(row, col)
+            self.links[i * len(ALL_DIRECTIONS) + code] = self.index(exit_row, exit_col)
+
+        if exits is None:
+            exits = bytearray(size)
+            for i in range(size):
+                for code in range(len(ALL_DIRECTIONS)):
+                    j = self.links[i * len(ALL_DIRECTIONS) + code]
+                    if j >= 0 and costs[j] <= PASSABLE_CELL_COST:
+                        exits[i] |= 1 << code
+        self.exits = bytearray(exits)
+        self.packed = True
+        return self
+
+    def unpack_(self):
+        # back to a cell dictionary, keeping the links that skip adjacency
+        self.cells = {}
+        for i in range(self.width * self.height):
+            if self.costs[i] == IMPASSABLE_CELL_COST:
+                continue
+            cell = self.cell_at(i)
+            self.cells[f'{cell.row} {cell.col}'] = cell
+            for code, direction in enumerate(ALL_DIRECTIONS):
+                d_row, d_col = offsets[direction]
+                j = self.links[i * len(ALL_DIRECTIONS) + code]
+                if j != self.index(cell.row + d_row, cell.col + d_col):
+                    cell.neighbors[direction] = self.cell_at(j)
+
+        self.costs = self.links = self.exits = self.slots = None
+        self.packed = False
+
+    def index(self, row, col) -> int:
+        row -= self.top
+        col -= self.left
+        if 0 <= row < self.height and 0 <= col < self.width:
+            return row * self.width + col
+        return -1
+
+    def position(self, i) -> tuple[int, int]:
+        row, col = divmod(i, self.width)
+        return row + self.top, col + self.left
+
+    def cell_at(self, i) -> GridCell:
+        cell = self.slots[i]
+        if cell is None:
+            row, col = self.position(i)
+            cell = GridCell(row, col, self.costs[i])
+            self.slots[i] = cell
+        return cell
+
+    def get_packed_(self, row, col) -> GridCell:
+        row -= self.top
+        col -= self.left
+        if 0 <= row < self.height and 0 <= col < self.width:
+            i = row * self.width + col
+            return self.slots[i] or self.cell_at(i)
+        return IMPASSABLE_CELL
 
     def get_neighbors(self, cell: GridCell) -> dict[str, GridCell]:
+        if self.packed:
+            return self.get_neighbors_packed_(cell)
+        return self.get_adjacent_(cell)
+
+    def get_adjacent_(self, cell: GridCell) -> dict[str, GridCell]:
         if len(cell.neighbors) == len(ALL_DIRECTIONS):
             return cell.neighbors
 
@@ -33,45 +226,80 @@ class Grid:
         cell.neighbors.update(neighbors)
         return cell.neighbors
 
+    def get_neighbors_packed_(self, cell: GridCell) -> dict[str, GridCell]:
+        if len(cell.neighbors) == len(ALL_DIRECTIONS):
+            return cell.neighbors
+
+        i = self.index(cell.row, cell.col)
+        links = self.links[i * len(ALL_DIRECTIONS):(i + 1) * len(ALL_DIRECTIONS)]
+        if i < 0 or -1 in links:
+            return self.get_adjacent_(cell)
+
+        for direction, j in zip(ALL_DIRECTIONS, links):
+            if direction not in cell.neighbors:
+                cell.neighbors[direction] = self.slots[j] or self.cell_at(j)
+        return cell.neighbors
+
+    def is_open(self, cell: GridCell, direction) -> bool:
+        if not self.packed:
+            return self.get_neighbors(cell)[direction].is_passable
+        i = self.index(cell.row, cell.col)
+        return i >= 0 and bool(self.exits[i] >> ALL_DIRECTIONS.index(direction) & 1)
+
+    def freeze(self) -> GridSnapshot:
+        if not self.packed:
+            self.pack()
+        if self.snapshot is None:
+            self.snapshot = GridSnapshot(self)
+        return self.snapshot
+
     def pathfind(self, start, goal) -> list:
         with self.pathing_lock:
             return self.pathfind_(start, goal)
 
     def pathfind_(self, start, goal) -> list:
-        for cell in self.cells.values():
-            cell.reset()
+        # cells written by older searches are treated as unvisited,
+        # so there is no need to reset the whole map beforehand
+        self.generation += 1
+        generation = self.generation
+        order = itertools.count()
 
         manhattan = lambda s, g: abs(s.row - g.row) + abs(s.col - g.col)
+        start.parent = None
+        start.g = 0
         start.h = manhattan(start, goal)
         start.f = start.h
+        start.opened = generation
 
-        closed = []
-        opened = [start]
-
+        opened = [(start.f, next(order), start)]
         while opened:
-            opened = sorted(opened, key = lambda cel: cel.f)
-            cell = opened.pop(0)
-            closed.append(cell)
+            f, _, cell = heapq.heappop(opened)
+            if cell.closed == generation or f > cell.f:
+                continue
+
+            cell.closed = generation
             if cell == goal:
                 path = []
                 while cell:
-                    path.insert(0, cell)
+                    path.append(cell)
                     cell = cell.parent
+                path.reverse()
                 return path
 
             neighbors = self.get_neighbors(cell)
             for neighbor in neighbors.values():
-                if neighbor not in closed:
-                    newg = cell.g + neighbor.cost
+                if neighbor.closed == generation:
+                    continue
 
-                    if neighbor not in opened:
-                        opened.append(neighbor)
-                    elif newg >= neighbor.g:
-                        continue
+                newg = cell.g + neighbor.cost
+                if neighbor.opened == generation and newg >= neighbor.g:
+                    continue
 
-                    neighbor.g = newg
-                    neighbor.h = manhattan(neighbor, goal)
-                    neighbor.f = neighbor.g + neighbor.h
-                    neighbor.parent = cell
+                neighbor.opened = generation
+                neighbor.g = newg
+                neighbor.h = manhattan(neighbor, goal)
+                neighbor.f = neighbor.g + neighbor.h
+                neighbor.parent = cell
+                heapq.heappush(opened, (neighbor.f, next(order), neighbor))
 
-        return []
\ No newline at end of file
+        return []
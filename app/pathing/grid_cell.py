@@ -1,7 +1,14 @@
 PASSABLE_CELL_COST = 1
+DOOR_CELL_COST = 50
+WALL_CELL_COST = 100
 IMPASSABLE_CELL_COST = 999
 
 class GridCell:
+    # search generation in which g/h/f/parent were last written,
+    # and the one in which the cell was last expanded
+    opened = 0
+    closed = 0
+
     def __init__(self, row: int, col: int, cost: int, neighbors: dict = None):
         self.neighbors = neighbors or {}
         self.parent = None
@@ -31,4 +38,8 @@ class GridCell:
 
     @classmethod
     def impassable_at(cls, row, col):
-        return GridCell(row, col, IMPASSABLE_CELL_COST)
\ No newline at end of file
+        return GridCell(row, col, IMPASSABLE_CELL_COST)
+
+
+# what a grid returns for any cell it does not store, far from every real cell
+IMPASSABLE_CELL = GridCell(-1 << 31, -1 << 31, IMPASSABLE_CELL_COST)
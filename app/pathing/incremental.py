@@ -0,0 +1,171 @@
+import heapq
+import threading
+from array import array
+
+from app.pathing.directions import ALL_DIRECTIONS
+
+INFINITY = 1 << 40
+
+
+class IncrementalPlanner:
+    '''
+      Moving target adaptive A* over a GridSnapshot, for a searcher
+      chasing a goal that moves between plans.
+
+      Every plan is an A* search whose heuristic is learned from the
+      plans before it: a cell expanded by a search gets the cost of that
+      search minus its distance from the start, a tight estimate of its
+      distance to the goal. When the goal moves, all the estimates are
+      lowered by the estimated distance it moved so they stay admissible
+      and consistent. The start may move freely, the estimates only
+      depend on the goal.
+
+      A plan only expands the cells whose estimates the moves of the
+      goal left too low, on a chase a fraction of what a search from
+      scratch expands. Cells are brought up to date lazily when a
+      search reaches them, a plan never touches the rest of the maze.
+
+      The first plan starts from the Manhattan distance, shortened by
+      the tunnels where going through one is shorter. Plans on the same
+      planner are serialized by its own lock.
+    '''
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        size = len(snapshot.costs)
+        self.g = array('q', [INFINITY]) * size
+        self.h = array('q', [0]) * size
+        self.parents = array('l', [-1]) * size
+        self.searches = array('l', [0]) * size  # last search each cell was seen by, 0 for none
+        self.path_costs = [INFINITY]  # by search
+        self.shifts = [0]  # how far the goal moved before each search
+        self.search = 0
+        self.goal = -1
+        self.goal_at = (0, 0)
+        self.exits = []  # tunnel entrances and their distance to the goal
+        self.exits_by_goal = {}
+        self.expanded = 0  # cells expanded by the last plan
+        self.lock = threading.Lock()
+
+    def distance_(self, i, j) -> int:
+        row, col = divmod(i, self.snapshot.width)
+        other_row, other_col = divmod(j, self.snapshot.width)
+        return abs(row - other_row) + abs(col - other_col)
+
+    def set_goal_(self, goal):
+        self.goal = goal
+        self.goal_at = divmod(goal, self.snapshot.width)
+        self.exits = self.exits_by_goal.get(goal)
+        if self.exits is not None:
+            return
+
+        # shortest ways to the goal through walls, taking tunnels for a step
+        tunnels = self.snapshot.tunnels
+        distances = dict((exit, self.distance_(exit, goal)) for _, exit in tunnels)
+        for _ in tunnels:
+            for exit in distances:
+                for entrance, other in tunnels:
+                    distances[exit] = min(distances[exit],
+                                          self.distance_(exit, entrance) + 1 + distances[other])
+        self.exits = [divmod(entrance, self.snapshot.width) + (1 + distances[exit],)
+                      for entrance, exit in tunnels]
+        self.exits_by_goal[goal] = self.exits
+
+    def heuristic(self, i) -> int:
+        row, col = divmod(i, self.snapshot.width)
+        goal_row, goal_col = self.goal_at
+        h = abs(row - goal_row) + abs(col - goal_col)
+        for entrance_row, entrance_col, distance in self.exits:
+            h = min(h, abs(row - entrance_row) + abs(col - entrance_col) + distance)
+        return h
+
+    def prepare_(self, i):
+        # brings the estimate of a cell last seen by an older search up
+        # to date and forgets its distance
+        seen = self.searches[i]
+        if seen == self.search:
+            return
+        if seen:
+            h = self.h[i]
+            path_cost = self.path_costs[seen]
+            if self.g[i] + h < path_cost < INFINITY:  # a failed search teaches nothing
+                h = path_cost - self.g[i]
+            h -= self.shifts[self.search] - self.shifts[seen]
+            self.h[i] = max(h, self.heuristic(i))
+        else:
+            self.h[i] = self.heuristic(i)
+        self.g[i] = INFINITY
+        self.searches[i] = self.search
+
+    def move_goal_(self, goal) -> int:
+        # the new goal's estimate of its distance to the old one, by
+        # which every estimate is lowered, lazily in prepare_
+        self.prepare_(goal)
+        h = self.h[goal]
+        path_cost = self.path_costs[self.search]
+        if self.g[goal] + h < path_cost < INFINITY:
+            h = path_cost - self.g[goal]
+        self.set_goal_(goal)
+        return h
+
+    def search_(self, start) -> int:
+        costs = self.snapshot.costs
+        links = self.snapshot.links
+        n_directions = len(ALL_DIRECTIONS)
+        g = self.g
+        h = self.h
+        parents = self.parents
+        goal = self.goal
+        searches = self.searches
+        search = self.search
+        closed = set()
+
+        self.prepare_(start)
+        self.prepare_(goal)
+        g[start] = 0
+        parents[start] = -1
+        opened = [(h[start], 0, start)]  # ties go to the cell furthest from the start
+        while opened:
+            _, minus_g, i = heapq.heappop(opened)
+            if i in closed or -minus_g > g[i]:
+                continue
+            if i == goal:
+                return g[i]
+
+            closed.add(i)
+            self.expanded += 1
+            for j in links[i * n_directions:(i + 1) * n_directions]:
+                if j < 0 or j in closed:
+                    continue
+                if searches[j] != search:
+                    self.prepare_(j)
+                newg = g[i] + costs[j]
+                if newg < g[j]:
+                    g[j] = newg
+                    parents[j] = i
+                    heapq.heappush(opened, (newg + h[j], -newg, j))
+
+        return INFINITY
+
+    def plan(self, start: int, goal: int) -> list[int]:
+        with self.lock:
+            self.expanded = 0
+            moved = 0
+            if self.goal < 0:
+                self.set_goal_(goal)
+            elif goal != self.goal:
+                moved = self.move_goal_(goal)
+            self.shifts.append(self.shifts[-1] + moved)
+            self.search += 1
+
+            path_cost = self.search_(start)
+            self.path_costs.append(path_cost)
+            if path_cost >= INFINITY:
+                return []
+
+            path = []
+            i = goal
+            while i >= 0:
+                path.append(i)
+                i = self.parents[i]
+            path.reverse()
+            return path
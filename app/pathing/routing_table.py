@@ -0,0 +1,119 @@
+import sys
+import heapq
+import struct
+import hashlib
+from array import array
+from typing import Union
+
+from app.pathing.directions import *
+from app.pathing.grid_cell import GridCell
+
+NO_ROUTE = 0xFF
+UNREACHABLE = 0xFFFFFFFF
+
+
+class RoutingTable:
+    '''
+      All-pairs distances and next-hop directions over the cells of a static Grid.
+      distances[start * size + goal] is the cost of the cheapest route,
+      hops[start * size + goal] is the index in ALL_DIRECTIONS of its first step.
+    '''
+    magic = b'PMRT'
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.cells: list[GridCell] = sorted(grid.iter_cells(), key=tuple)
+        self.index = dict((tuple(cell), i) for i, cell in enumerate(self.cells))
+        self.size = len(self.cells)
+        self.links = [self.get_links_(cell) for cell in self.cells]
+        self.distances = None
+        self.hops = None
+
+    def get_links_(self, cell) -> list[int]:
+        neighbors = self.grid.get_neighbors(cell)
+        return [self.index.get(tuple(neighbors[d]), -1) for d in ALL_DIRECTIONS]
+
+    def digest(self) -> bytes:
+        layout = hashlib.sha1(sys.byteorder.encode())
+        for cell, links in zip(self.cells, self.links):
+            layout.update(struct.pack('<iii', cell.row, cell.col, cell.cost))
+            layout.update(struct.pack('<4i', *links))
+        return layout.digest()
+
+    def build(self):
+        size = self.size
+        costs = [cell.cost for cell in self.cells]
+        incoming = [[] for _ in range(size)]
+        for i, links in enumerate(self.links):
+            for code, j in enumerate(links):
+                if j >= 0:
+                    incoming[j].append((code, i))
+
+        self.distances = array('I', [UNREACHABLE]) * (size * size)
+        self.hops = array('B', [NO_ROUTE]) * (size * size)
+        for goal in range(size):
+            distances = [UNREACHABLE] * size
+            distances[goal] = 0
+            opened = [(0, goal)]
+            while opened:
+                distance, cell = heapq.heappop(opened)
+                if distance > distances[cell]:
+                    continue
+                distance += costs[cell]
+                for code, neighbor in incoming[cell]:
+                    if distance < distances[neighbor]:
+                        distances[neighbor] = distance
+                        self.hops[neighbor * size + goal] = code
+                        heapq.heappush(opened, (distance, neighbor))
+
+            for start in range(size):
+                self.distances[start * size + goal] = distances[start]
+        return self
+
+    def pack(self) -> bytes:
+        header = self.magic + self.digest() + struct.pack('<I', self.size)
+        return header + self.distances.tobytes() + self.hops.tobytes()
+
+    def unpack(self, data) -> bool:
+        start = len(self.magic) + 20 + 4
+        header = bytes(data[:start])
+        if header[:-4] != self.magic + self.digest():
+            return False
+        if struct.unpack('<I', header[-4:])[0] != self.size:
+            return False
+
+        count = self.size * self.size
+        distances, hops = array('I'), array('B')
+        middle = start + count * distances.itemsize
+        distances.frombytes(data[start:middle])
+        hops.frombytes(data[middle:middle + count])
+        if len(distances) != count or len(hops) != count:
+            return False
+
+        self.distances, self.hops = distances, hops
+        return True
+
+    def knows(self, start, goal) -> bool:
+        return tuple(start) in self.index and tuple(goal) in self.index
+
+    def distance(self, start, goal) -> int:
+        key = self.index[tuple(start)] * self.size + self.index[tuple(goal)]
+        return self.distances[key]
+
+    def next_direction(self, start, goal) -> Union[str, None]:
+        key = self.index[tuple(start)] * self.size + self.index[tuple(goal)]
+        code = self.hops[key]
+        return None if code == NO_ROUTE else ALL_DIRECTIONS[code]
+
+    def route(self, start, goal) -> list[GridCell]:
+        goal_index = self.index[tuple(goal)]
+        i = self.index[tuple(start)]
+        if self.distances[i * self.size + goal_index] == UNREACHABLE:
+            return []
+
+        path = [self.cells[i]]
+        while i != goal_index:
+            code = self.hops[i * self.size + goal_index]
+            i = self.links[i][code]
+            path.append(self.cells[i])
+        return path
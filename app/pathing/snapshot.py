@@ -0,0 +1,117 @@
+import heapq
+import itertools
+from array import array
+from concurrent.futures import Future
+
+from app.pathing.directions import ALL_DIRECTIONS
+
+
+class GridSnapshot:
+    '''
+      Copy of a packed grid's costs and links, never modified after
+      it is taken, so any number of threads can search it at once
+      without a lock. Searches keep their state in locals and return
+      cell indices, turned into cells by the thread owning the grid.
+    '''
+    def __init__(self, grid):
+        self.width = grid.width
+        self.costs = array('H', grid.costs)
+        self.links = array('i', grid.links)
+
+        # links between cells that are not next to each other
+        n_directions = len(ALL_DIRECTIONS)
+        self.tunnels = []
+        for n, j in enumerate(self.links):
+            if j < 0:
+                continue
+            row, col = divmod(n // n_directions, self.width)
+            other_row, other_col = divmod(j, self.width)
+            if abs(row - other_row) + abs(col - other_col) != 1:
+                self.tunnels.append((n // n_directions, j))
+
+    def pathfind(self, start: int, goal: int) -> list[int]:
+        # same search as Grid.pathfind_, ties broken the same way
+        width = self.width
+        costs = self.costs
+        links = self.links
+        n_directions = len(ALL_DIRECTIONS)
+        goal_row, goal_col = divmod(goal, width)
+
+        size = len(costs)
+        g = array('l', [-1]) * size  # -1 until the cell is opened
+        f = array('l', [0]) * size
+        parents = array('l', [-1]) * size
+        closed = bytearray(size)
+        order = itertools.count()
+
+        row, col = divmod(start, width)
+        g[start] = 0
+        f[start] = abs(row - goal_row) + abs(col - goal_col)
+        opened = [(f[start], next(order), start)]
+        while opened:
+            cell_f, _, i = heapq.heappop(opened)
+            if closed[i] or cell_f > f[i]:
+                continue
+
+            closed[i] = 1
+            if i == goal:
+                path = []
+                while i >= 0:
+                    path.append(i)
+                    i = parents[i]
+                path.reverse()
+                return path
+
+            for j in links[i * n_directions:(i + 1) * n_directions]:
+                if j < 0 or closed[j]:
+                    continue
+
+                newg = g[i] + costs[j]
+                if g[j] >= 0 and newg >= g[j]:
+                    continue
+
+                row, col = divmod(j, width)
+                g[j] = newg
+                f[j] = newg + abs(row - goal_row) + abs(col - goal_col)
+                parents[j] = i
+                heapq.heappush(opened, (f[j], next(order), j))
+
+        return []
+
+
+class PathRequest:
+    '''
+      Path being searched for a sprite. The search runs on a worker
+      or, without one, before the request is returned. A search that
+      failed on its worker is done again on the grid when its result
+      is asked for.
+    '''
+    def __init__(self, grid, future: Future, start=None, goal=None):
+        self.grid = grid
+        self.future = future
+        self.start = start
+        self.goal = goal
+
+    @classmethod
+    def completed(cls, grid, path: list) -> 'PathRequest':
+        future = Future()
+        future.set_result(path)
+        return cls(grid, future)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self):
+        self.future.cancel()
+
+    def result(self) -> list:
+        # indices from a snapshot search, cells from anywhere else
+        try:
+            path = self.future.result()
+        except Exception:
+            if self.start is None:
+                raise
+            return self.grid.pathfind(self.start, self.goal)
+        if path and isinstance(path[0], int):
+            return [self.grid.cell_at(i) for i in path]
+        return path
@@ -1,12 +1,18 @@
-import pickle
-from random import randint
+import os
+import random
 
 from pygame.locals import *
 
-from app.pathing.grid import Grid
+from app.core import clock
+from app.core.profiler import profile
+from app.core.level import Level
 from app.scenes.scene import Scene
 from app.core.gametypes import GameTypes
+from app.core.tile_index import TileIndex
 from app.pathing.grid_cell import GridCell
+from app.pathing.snapshot import PathRequest
+from app.pathing.flow_field import FlowField
+from app.pathing.routing_table import RoutingTable
 
 from app.sprites.other import *
 from app.sprites.ghost import Ghost
@@ -16,18 +22,43 @@ from app.sprites.ghost_mode import SCATTERING, CHASING
 
 
 class Game(Scene):
-    def __init__(self, app):
-        super().__init__(app, pygame.sprite.LayeredDirty())
-        self.channel = pygame.mixer.find_channel()
+    static_types = (Wall, Door)
+    use_routing_table = False  # build one in memory for levels without their own
+    max_routed_cells = 1024  # the table takes cells² entries to build and keep
+    use_incremental_search = False  # chasing ghosts keep their search between plans
+    templates = {}  # level name -> (Level, Grid, RoutingTable), shared by every Game
+
+    def __init__(self, app, seed=None):
+        super().__init__(app, pygame.sprite.LayeredUpdates())
         self.tilesize: int = 32
+        self.tiles = TileIndex(self.tilesize)
         self.starter = None
         self.pacman = None
+        self.pathfind_calls = 0
+        self.field_builds = 0  # flow fields built again for chasing ghosts
         self.router = None
+        self.flow_field = None
+        self.level_name = None
+        self.first_level = None
+        self.random = random.Random()
+        self.seed = None
+        self.recording = None
+        self.spawned = []
+        self.eaten = []
         self.ghosts = {}
         self.grid = None
         self.lives = 3
         self.bonus = 0
         self.score = 0
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        # everything random in a game draws from self.random,
+        # so the seed and Pacman's input are enough to replay it
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.random.seed(seed)
 
     def get_assets(self, assets_id):
         return self.app.assets[assets_id]
@@ -35,6 +66,9 @@ class Game(Scene):
     def get_image(self, image_id):
         return self.get_assets(image_id).image
 
+    def play_sound(self, sound_id, queued=False):
+        self.app.audio.play(sound_id, queued)
+
     def get_cell_pos_(self, row: int, col: int) -> tuple[int, int]:
         return col * self.tilesize, row * self.tilesize
 
@@ -42,8 +76,8 @@ class Game(Scene):
         return self.get_cell_pos_(cell.row, cell.col)
 
     def get_cell_by_pos(self, pos) -> GridCell:
-        col, row = [int(v / self.tilesize) for v in pos]
-        return self.grid.get(row, col)
+        x, y = pos
+        return self.grid.get(int(y / self.tilesize), int(x / self.tilesize))
 
     def react(self, app, event):
         if event.type == KEYDOWN:
@@ -58,35 +92,48 @@ class Game(Scene):
     def add_sprite(self, sprite):
         layer = GameTypes.get_layer(type(sprite))
         self.sprites.add(sprite, layer=layer)
+        self.tiles.add(sprite)
 
     def get_sprites_of_class(self, sprite_class) -> list:
         layer = GameTypes.get_layer(sprite_class)
         return self.sprites.get_sprites_from_layer(layer)
 
+    def get_sprites_near(self, rect) -> list:
+        sprites = self.tiles.query(rect)
+        sprites.sort(key=self.sprites.get_layer_of_sprite)
+        return sprites
+
+    def is_blocked(self, rect) -> bool:
+        tsize = self.tilesize
+        for col in range(rect.left // tsize, (rect.right - 1) // tsize + 1):
+            for row in range(rect.top // tsize, (rect.bottom - 1) // tsize + 1):
+                if not self.grid.get(row, col).is_passable:
+                    return True
+        return False
+
     def on_collision(self, sprite):
         if isinstance(sprite, Dot):
-            eating_sound = self.get_assets('eating.wav')
-            self.channel.queue(eating_sound)
+            self.play_sound('eating.wav', queued=True)
             self.score += 10
+            self.eaten.append(sprite)
             sprite.kill()
             self.bonus_spawn_check()
             self.last_dot_check()
 
         elif isinstance(sprite, Energizer):
-            eating_bonus = self.get_assets('eating_bonus.wav')
-            self.channel.play(eating_bonus)
+            self.play_sound('eating_bonus.wav')
             for ghost in list(self.ghosts.values()):
                 ghost.frighten()
             self.bonus = 200
             self.score += 50
+            self.eaten.append(sprite)
             sprite.kill()
             self.bonus_spawn_check()
             self.last_dot_check()
             self.play_scared_sound()
 
         elif isinstance(sprite, Fruit):
-            eating_bonus = self.get_assets('eating_bonus.wav')
-            self.channel.play(eating_bonus)
+            self.play_sound('eating_bonus.wav')
             self.score += 500
             sprite.kill()
 
@@ -96,15 +143,13 @@ class Game(Scene):
                 ts_score = TimedSprite(self, sprite.get_pos(), ts_name, 800)
                 self.add_sprite(ts_score)
 
-                eating_ghosts = self.get_assets('eating_ghosts.wav')
-                self.channel.play(eating_ghosts)
+                self.play_sound('eating_ghosts.wav')
                 self.score += self.bonus
                 sprite.send_to_home()
                 self.bonus *= 2
 
             elif sprite.mode in [SCATTERING, CHASING]:
-                death_sound = self.get_assets('death.wav')
-                self.channel.play(death_sound)
+                self.play_sound('death.wav')
                 for ghost in list(self.ghosts.values()):
                     ghost.reset()
                 self.pacman.kill()
@@ -113,14 +158,17 @@ class Game(Scene):
     def bonus_spawn_check(self):
         dots = len(self.get_sprites_of_class(Dot))
         if dots in [60, 120]:
-            bonus_name = 'bonus' + str(randint(1, 5))
+            bonus_name = 'bonus' + str(self.random.randint(1, 5))
             bonus = Fruit(self, self.pacman.initial_pos, bonus_name, 8000)
             self.add_sprite(bonus)
 
     def last_dot_check(self):
         dots = self.get_sprites_of_class(Dot)
         if len(dots) == 0:
-            self.after_delay(200, self.app.show_scores)
+            if self.get_next_level_name():
+                self.after_delay(200, self.next_level)
+            else:
+                self.after_delay(200, self.app.show_scores)
 
     def end_game_check(self):
         if self.lives > 0:
@@ -133,12 +181,10 @@ class Game(Scene):
             self.after_delay(200, self.app.show_scores)
 
     def play_scared_sound(self):
-        for ghost in list(self.ghosts.values()):
-            if ghost.is_vulnerable():
-                ghosts_scared = self.get_assets('ghosts_scared.wav')
-                self.after_delay(ghosts_scared.get_length(), self.play_scared_sound)
-                self.channel.queue(ghosts_scared)
-                break
+        self.app.audio.play('ghosts_scared.wav', repeat=self.any_vulnerable_)
+
+    def any_vulnerable_(self):
+        return any(ghost.is_vulnerable() for ghost in self.ghosts.values())
 
     def start(self):
         self.starter = None
@@ -146,25 +192,87 @@ class Game(Scene):
         for ghost in list(self.ghosts.values()):
             ghost.animate()
 
-    def pathfind(self, sprite, start, goal):
-        sprite.follow_path(self.grid.pathfind(start, goal))
+    def request_path(self, start, goal, planner=None) -> PathRequest:
+        '''
+          Routes come from the routing table when it knows both cells.
+          Other searches go to the app's path workers over a snapshot of
+          the grid, unless there are none or the game is being recorded,
+          then they run here so the game stays replayable.
+          planner: IncrementalPlanner of the caller, searching instead of A*.
+        '''
+        self.pathfind_calls += 1
+        if self.router and self.router.knows(start, goal):
+            return PathRequest.completed(self.grid, self.router.route(start, goal))
 
-    def load(self):
-        level_file = None
-        try:
-            level_file = open('level1', 'rb')  #  list[PickledSprite], cells: dict[str, GridCell]
-            objects = pickle.load(level_file)
-            for obj in objects:
-                self.add_sprite(obj.create(self))
+        workers = self.app.path_workers
+        i = self.grid.index(start.row, start.col)
+        j = self.grid.index(goal.row, goal.col)
+        synchronous = workers is None or self.recording is not None
+        if i < 0 or j < 0 or (synchronous and planner is None):
+            return PathRequest.completed(self.grid, self.grid.pathfind(start, goal))
+
+        search = planner.plan if planner else self.grid.freeze().pathfind
+        if synchronous:
+            return PathRequest.completed(self.grid, search(i, j))
+        return PathRequest(self.grid, workers.submit(search, i, j), start, goal)
+
+    def get_flow_field(self):
+        '''
+          Distances to Pacman's tile shared by every chasing ghost, built
+          again when Pacman entered another tile. None when the routing
+          table or the incremental planner answers the chases instead,
+          whatever the number of ghosts chasing.
+        '''
+        if self.router or self.use_incremental_search:
+            return None
+
+        snapshot = self.grid.freeze()
+        if self.flow_field is None or self.flow_field.snapshot is not snapshot:
+            self.flow_field = FlowField(snapshot)
+        goal = self.get_cell_by_pos(self.pacman.get_pos())
+        i = self.grid.index(goal.row, goal.col)
+        if i < 0:
+            return None
+        if self.flow_field.update(i):
+            self.field_builds += 1
+        return self.flow_field
 
-            self.grid = Grid()
-            self.grid.cells = pickle.load(level_file)
+    def get_template_(self, level_name):
+        template = self.templates.get(level_name)
+        if template is None:
+            level = Level.load(level_name)
+            grid = level.create_grid()
+            router = level.create_router(grid)
+            if router is None and self.use_routing_table:
+                table = RoutingTable(grid)
+                if table.size <= self.max_routed_cells:
+                    router = table.build()
+            template = (level, grid, router)
+            self.templates[level_name] = template
+        return template
 
-        except FileNotFoundError as e:
+    def load(self, level_name='level1'):
+        try:
+            level, self.grid, self.router = self.get_template_(level_name)
+        except FileNotFoundError:
             self.app.close()
             return
-        finally:
-            level_file.close()
+
+        self.level_name = level_name
+        self.first_level = self.first_level or level_name
+        if self.app.screen:
+            self.background = pygame.Surface(self.app.screen.get_size())
+        for obj in level.get_objects():
+            if obj.cls in self.static_types:
+                if self.background is None:
+                    continue
+                pos = self.get_cell_pos_(obj.row, obj.col)
+                rect = pygame.Rect(pos, (self.tilesize, self.tilesize))
+                obj.cls.paint(self.background, rect)
+            else:
+                sprite = obj.create(self)
+                self.spawned.append(sprite)
+                self.add_sprite(sprite)
 
         ghosts = self.get_sprites_of_class(Ghost)
         self.ghosts = dict([(g.name, g) for g in ghosts])
@@ -172,7 +280,83 @@ class Game(Scene):
         self.events.add_observer(self.pacman, KEYDOWN)
         self.starter = self.after_delay(800, self.start)
 
-    def update(self):
-        if self.starter:
-            return self.service_update()
-        return super().update()
\ No newline at end of file
+    def unload_(self):
+        self.sprites.empty()
+        self.tiles.clear()
+        self.scheduler.clear()
+        self.events.observers[KEYDOWN].remove(self.pacman)
+        self.spawned = []
+        self.eaten = []
+
+    def reset(self, level_name=None, seed=None):
+        '''
+          Starts a new game from level_name, by default the first level
+          loaded, putting back the dots eaten and the sprites moved since
+          load() instead of loading the level again. The tile index is
+          rebuilt in the order load() filled it, so collisions are met in
+          the same order as in a freshly loaded game.
+        '''
+        level_name = level_name or self.first_level
+        if level_name != self.level_name:
+            self.unload_()
+            self.load(level_name)
+        else:
+            self.scheduler.clear()
+            transient = self.get_sprites_of_class(Fruit) + self.get_sprites_of_class(TimedSprite)
+            for sprite in transient:
+                sprite.kill()
+            self.tiles.clear()
+            for sprite in self.eaten:
+                self.sprites.add(sprite, layer=GameTypes.get_layer(type(sprite)))
+            self.eaten = []
+            for sprite in self.get_sprites_of_class(Energizer):
+                sprite.restore()
+            for ghost in self.ghosts.values():
+                ghost.restore()
+            self.pacman.restore()
+            for sprite in self.spawned:
+                self.tiles.add(sprite)
+            self.starter = self.after_delay(800, self.start)
+
+        self.app.audio.stop()
+        self.pathfind_calls = 0
+        self.field_builds = 0
+        self.lives = 3
+        self.bonus = 0
+        self.score = 0
+        self.reseed(seed)
+
+    def get_next_level_name(self):
+        # level1 -> level2, None when the level has no number or no successor
+        base = self.level_name.rstrip('0123456789')
+        number = self.level_name[len(base):]
+        if not number:
+            return None
+        next_name = base + str(int(number) + 1)
+        return next_name if os.path.exists(next_name) else None
+
+    def next_level(self):
+        self.unload_()
+        self.load(self.get_next_level_name())
+
+    def simulate(self):
+        steered = self.pacman.new_direction
+        if not self.starter:
+            self.update_sprites()
+        with profile(self.app.profiler, 'timers'):
+            self.update_timers()
+        if self.recording is not None:
+            self.recording.record(self, steered)
+
+    def step(self, n_ticks=1) -> int:
+        '''
+          Advances the game by n_ticks fixed ticks on the active TickClock,
+          without handling events or drawing anything.
+          Returns the number of ticks simulated before the game was left.
+        '''
+        ticks = 0
+        while ticks < n_ticks and self.app.scene is self:
+            clock.get_clock().advance(clock.TICK_DURATION)
+            self.simulate()
+            ticks += 1
+        return ticks
@@ -1,5 +1,4 @@
 import pygame
-from io import BytesIO
 from pygame.locals import *
 
 from app.scenes.scene import Scene
@@ -11,23 +10,16 @@ class Menu(Scene):
         super().__init__(app, pygame.sprite.RenderUpdates())
         x_center = app.screen.get_width() / 2
 
-        firenight = BytesIO(app.assets['firenight.otf'])
-        firenight_60 = pygame.font.Font(firenight, 60)
-        firenight.seek(0)
-        firenight_36 = pygame.font.Font(firenight, 36)
-
-        inconsolata = BytesIO(app.assets['inconsolata.otf'])
-        inconsolata_18 = pygame.font.Font(inconsolata, 18)
-        inconsolata.seek(0)
-        inconsolata_14 = pygame.font.Font(inconsolata, 14)
-        inconsolata.seek(0)
-        inconsolata_12 = pygame.font.Font(inconsolata, 12)
+        firenight_60 = app.fonts.get('firenight.otf', 60)
+        firenight_36 = app.fonts.get('firenight.otf', 36)
+        inconsolata_18 = app.fonts.get('inconsolata.otf', 18)
+        inconsolata_14 = app.fonts.get('inconsolata.otf', 14)
+        inconsolata_12 = app.fonts.get('inconsolata.otf', 12)
 
         self.add_label(firenight_60, 'Pacman', x_center, 15, (255, 255, 0))
         self.add_label(firenight_36, 'Records', x_center, 150, (255, 0, 0))
 
-        records = sorted(list(app.records.items()), key=lambda z: z[1], reverse=True)
-        for z, (name, scores) in enumerate(records[:5]):
+        for z, (name, scores) in enumerate(app.records.top(5)):
             scores = str(scores).ljust(5)
             record_txt = '{}) {}  {}'.format(z+1, name.ljust(12), scores)
             self.add_label(inconsolata_18, record_txt, x_center, 200 + z * 20)
@@ -50,9 +42,6 @@ class Menu(Scene):
         footer_text = 'etofamiliya 2017-2025'
         self.add_label(inconsolata_12, footer_text, x_center, 590)
 
-        # inconsolata.close()
-        # firenight.close()
-
     def react(self, app, event):
         if event.type == KEYDOWN:
             alt_f4 = event.key == K_F4 and bool(event.mod & KMOD_ALT)
@@ -1,34 +1,57 @@
 from pygame.locals import *
-from app.core.timer import Timer
+from app.core.scheduler import Scheduler
+from app.core.profiler import profile
 from app.core.event_handler import EventHandler
 
 
 class Scene:
     def __init__(self, app, sprites):
         self.app = app
-        self.timers = []
+        self.scheduler = Scheduler()
         self.sprites = sprites
-        self.full_redraw = True
+        self.background = None
         self.events = EventHandler(app)
         self.events.add_observer(self, KEYDOWN, KEYUP, QUIT)
+        self.events.add_observer(app.audio, *app.audio.event_types)
 
     def get_rendering_area(self):
-        if self.full_redraw:
-            self.full_redraw = False
-            return self.app.screen.get_rect()
-        return self.sprites.draw(self.app.screen)
+        if self.app.screen is None:
+            return []
+        return self.app.renderer.draw(self.sprites, self.background)
 
     def after_delay(self, duration, action):
-        timer = Timer(duration, action)
-        self.timers.append(timer)
-        return timer
+        return self.scheduler.after_delay(duration, action)
 
-    def service_update(self):
-        self.events.handle()
-        self.timers = [tm.update() for tm in self.timers if tm.active]
-        return self.get_rendering_area()
+    def every(self, period, action):
+        return self.scheduler.every(period, action)
+
+    def update_timers(self):
+        self.scheduler.update()
+
+    def update_sprites(self):
+        profiler = self.app.profiler
+        if profiler:
+            with profiler.phase('sprites'):
+                profiler.update_sprites(self.sprites)
+        else:
+            self.sprites.update()
+
+    def handle_events(self):
+        with profile(self.app.profiler, 'events'):
+            self.events.handle()
+
+    def simulate(self):
+        self.update_sprites()
+        with profile(self.app.profiler, 'timers'):
+            self.update_timers()
+
+    def render(self):
+        with profile(self.app.profiler, 'draw'):
+            return self.get_rendering_area()
 
     def update(self):
-        self.sprites.update()
-        return self.service_update()
+        # one tick and one frame, for loops that do not need them apart
+        self.handle_events()
+        self.simulate()
+        return self.render()
 
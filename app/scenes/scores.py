@@ -1,5 +1,3 @@
-from io import BytesIO
-
 import pygame
 from pygame.locals import *
 
@@ -13,20 +11,16 @@ class Scores(Scene):
 
         score = app.game.score
         x_center = app.screen.get_width() / 2
-        inconsolata = BytesIO(app.assets['inconsolata.otf'])
-        inconsolata_14 = pygame.font.Font(inconsolata, 14)
-        inconsolata.seek(0)
-        inconsolata_12 = pygame.font.Font(inconsolata, 12)
+        inconsolata_14 = app.fonts.get('inconsolata.otf', 14)
+        inconsolata_12 = app.fonts.get('inconsolata.otf', 12)
 
         scores_text = 'Your scores: ' + str(score)
         anykey_text = 'Press any key to continue'
 
         self.add_label(inconsolata_14, scores_text, x_center, 200)
         self.add_label(inconsolata_12, anykey_text, x_center, 225)
-        inconsolata.close()
 
-        if score > app.records.get(app.player, 0):
-            app.records[app.player] = score
+        app.records.submit(app.player, score)
 
     def add_label(self, font, text, x_center, y_offset, color=(222, 222, 222)):
         sprite = TextLabel(font, text, x_center, y_offset, color)
@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import time
+import argparse
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.core.clock import FRAME_RATE
+from app.core.replay import Replay
+from app.simulation.headless import HeadlessApp
+from app.simulation.controllers import get_controller
+
+APP_DIR = os.path.dirname(os.path.dirname(__file__))
+LEVEL_PATH = os.path.join(APP_DIR, 'level1')
+ASSETS_PATH = os.path.join(APP_DIR, 'assets')
+
+
+@lru_cache(maxsize=None)
+def load_assets(assets_path) -> dict:
+    app = HeadlessApp()
+    app.load_assets(assets_path)
+    return app.assets
+
+
+def run_game(seed, controller='random', max_ticks=FRAME_RATE * 600,
+             level_path=LEVEL_PATH, assets_path=ASSETS_PATH, record_dir=None) -> dict:
+    started = time.perf_counter()
+
+    app = HeadlessApp(load_assets(assets_path))
+    game = app.new_game(level_path, seed)
+    if record_dir:
+        game.recording = Replay(level_path, seed)
+    steer = get_controller(controller)(seed)
+    lives = game.lives
+
+    ticks = 0
+    while ticks < max_ticks and app.scene is game:
+        direction = steer(game)
+        if direction:
+            game.pacman.steer(direction)
+        ticks += game.step(1)
+
+    if record_dir:
+        game.recording.save(os.path.join(record_dir, f'{seed}.replay'))
+
+    return {
+        'seed': seed,
+        'score': game.score,
+        'lives_lost': lives - game.lives,
+        'ticks': ticks,
+        'finished': app.scene is not game,
+        'pathfinding_calls': game.pathfind_calls,
+        'field_builds': game.field_builds,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def run_batch(seeds, controller='random', workers=None, **options):
+    '''
+      Runs one headless game per seed across a process pool
+      and yields each result as soon as its game is over.
+    '''
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_game, seed, controller, **options) for seed in seeds]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(results: list[dict]) -> dict:
+    games = len(results)
+    if not games:
+        return {'games': 0}
+
+    mean = lambda key: sum(r[key] for r in results) / games
+    return {
+        'games': games,
+        'mean_score': mean('score'),
+        'max_score': max(r['score'] for r in results),
+        'mean_lives_lost': mean('lives_lost'),
+        'mean_ticks': mean('ticks'),
+        'mean_pathfinding_calls': mean('pathfinding_calls'),
+        'mean_field_builds': mean('field_builds'),
+        'total_ticks': sum(r['ticks'] for r in results)
+    }
+
+
+def parse_seeds(text) -> list[int]:
+    seeds = []
+    for part in text.split(','):
+        first, _, last = part.partition('-')
+        seeds.extend(range(int(first), int(last or first) + 1))
+    return seeds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run headless games in parallel')
+    parser.add_argument('--seeds', default='0-15', help='e.g. 0-99 or 1,5,7-9')
+    parser.add_argument('--controller', default='random',
+                        help='idle, random, seeker or package.module:Class')
+    parser.add_argument('--max-ticks', type=int, default=FRAME_RATE * 600)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--level', default=LEVEL_PATH)
+    parser.add_argument('--assets', default=ASSETS_PATH)
+    parser.add_argument('--record-dir', metavar='DIR',
+                        help='save a replay of every game as DIR/<seed>.replay')
+    args = parser.parse_args()
+
+    if args.record_dir:
+        os.makedirs(args.record_dir, exist_ok=True)
+    options = {
+        'max_ticks': args.max_ticks,
+        'level_path': os.path.abspath(args.level),
+        'assets_path': os.path.abspath(args.assets),
+        'record_dir': args.record_dir and os.path.abspath(args.record_dir)
+    }
+    results = []
+    batch = run_batch(parse_seeds(args.seeds), args.controller, args.workers, **options)
+    for result in batch:
+        results.append(result)
+        print(json.dumps(result), flush=True)
+
+    print(json.dumps({'summary': summarize(results)}))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
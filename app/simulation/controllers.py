@@ -0,0 +1,84 @@
+import random
+import importlib
+import pygame
+from collections import deque
+
+from app.sprites.other import Dot, Energizer
+from app.pathing.directions import *
+
+
+class Controller:
+    '''
+      Steers Pacman in a headless game. Called once per tick,
+      returns a direction for Pacman.steer or None to keep going.
+    '''
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+
+    def at_tile(self, game) -> bool:
+        x, y = game.pacman.get_pos()
+        speed = game.pacman.speed
+        return x % game.tilesize <= speed and y % game.tilesize <= speed
+
+    def get_open_directions(self, game) -> list[str]:
+        cell = game.get_cell_by_pos(game.pacman.get_pos())
+        return [d for d in ALL_DIRECTIONS if game.grid.is_open(cell, d)]
+
+    def __call__(self, game):
+        return None
+
+
+class RandomWalk(Controller):
+    def __call__(self, game):
+        if not self.at_tile(game):
+            return None
+
+        pacman = game.pacman
+        directions = self.get_open_directions(game)
+        forward = pacman.speed and pacman.direction in directions
+        if forward and self.random.random() < 0.7:
+            return None
+        return self.random.choice(directions) if directions else None
+
+
+class DotSeeker(Controller):
+    def __call__(self, game):
+        if not self.at_tile(game):
+            return None
+
+        start = game.get_cell_by_pos(game.pacman.get_pos())
+        first_steps = {tuple(start): None}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            tile = pygame.Rect(game.get_cell_pos(cell), (game.tilesize, game.tilesize))
+            for sprite in game.get_sprites_near(tile):
+                if isinstance(sprite, (Dot, Energizer)):
+                    return first_steps[tuple(cell)]
+
+            neighbors = game.grid.get_neighbors(cell)
+            for direction in ALL_DIRECTIONS:
+                neighbor = neighbors[direction]
+                key = tuple(neighbor)
+                if neighbor.is_passable and key not in first_steps:
+                    first_steps[key] = first_steps[tuple(cell)] or direction
+                    queue.append(neighbor)
+
+        return self.random.choice(self.get_open_directions(game) or [None])
+
+
+controllers = {
+    'idle': Controller,
+    'random': RandomWalk,
+    'seeker': DotSeeker
+}
+
+
+def get_controller(spec: str):
+    '''
+      Resolves a builtin controller name or a 'package.module:Class' path.
+    '''
+    if spec in controllers:
+        return controllers[spec]
+    module_name, _, name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), name)
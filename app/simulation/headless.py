@@ -0,0 +1,49 @@
+from app.scenes.game import Game
+from app.graphics.renderer import Renderer
+from app.core.audio import NullAudio
+from app.core.asset_pack import open_assets
+from app.core.clock import TickClock, use_clock
+
+
+class HeadlessApp:
+    '''
+      Stands in for App when a game is simulated without a window or mixer.
+      Timers, animations and ghost modes run on a TickClock that only
+      advances through Game.step, so a game runs as fast as the CPU allows.
+    '''
+    def __init__(self, assets=None, screen=None):
+        self.running = True
+        self.screen = screen
+        self.renderer = Renderer(screen) if screen else None
+        self.scene = None
+        self.records = {}
+        self.audio = NullAudio()
+        self.path_workers = None  # searches run synchronously
+        self.assets = assets or {}
+        self.profiler = None
+        self.player = ''
+        self.game = None
+        self.clock = None
+
+    def load_assets(self, assets_path='assets'):
+        self.assets = open_assets(assets_path)  # sounds stay undecoded
+
+    def new_game(self, level_name='level1', seed=None) -> Game:
+        self.clock = use_clock(TickClock())
+        self.game = Game(self, seed)
+        self.game.load(level_name)
+        self.show_game()
+        return self.game
+
+    def show_game(self):
+        self.scene = self.game
+
+    def show_menu(self):
+        self.scene = None
+
+    def show_scores(self):
+        self.scene = None
+
+    def close(self):
+        self.scene = None
+        self.running = False
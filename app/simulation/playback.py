@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+from app.core.replay import Replay, state_hash
+from app.simulation.headless import HeadlessApp
+from app.simulation.batch import load_assets, ASSETS_PATH
+
+
+def play(replay: Replay, assets: dict, level_path=None, check=True) -> dict:
+    '''
+      Plays a replay back headless as fast as possible. With check,
+      stops at the first tick whose state hash differs from the recording.
+    '''
+    started = time.perf_counter()
+    app = HeadlessApp(assets)
+    game = app.new_game(level_path or replay.level_name, replay.seed)
+
+    ticks = 0
+    mismatch = None
+    while ticks < len(replay) and app.scene is game:
+        direction = replay.get_direction(ticks)
+        if direction:
+            game.pacman.steer(direction)
+        game.step(1)
+        if check and state_hash(game) != replay.hashes[ticks]:
+            mismatch = ticks
+            break
+        ticks += 1
+
+    seconds = time.perf_counter() - started
+    return {
+        'ticks': ticks,
+        'recorded_ticks': len(replay),
+        'mismatch': mismatch,
+        'score': game.score,
+        'seconds': round(seconds, 3),
+        'ticks_per_second': round(ticks / seconds) if seconds else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play replays back headless and check them')
+    parser.add_argument('replays', nargs='+', metavar='FILE')
+    parser.add_argument('--level', help='level file, instead of the one recorded')
+    parser.add_argument('--assets', default=ASSETS_PATH)
+    parser.add_argument('--no-check', action='store_true',
+                        help='only measure, do not compare state hashes')
+    args = parser.parse_args()
+
+    assets = load_assets(os.path.abspath(args.assets))
+    diverged = False
+    for path in args.replays:
+        result = play(Replay.load(path), assets, args.level, not args.no_check)
+        diverged = diverged or result['mismatch'] is not None
+        print(json.dumps({'replay': path, **result}), flush=True)
+    return 1 if diverged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,12 @@
-import pygame
-
-from random import shuffle
-
 from app.sprites.ghost_mode import *
 from app.pathing.directions import *
 from app.sprites.tunnel import Tunnel
 from app.sprites.sprite import Sprite
 from app.sprites.ghost_action import *
 from app.pathing.grid_cell import GridCell
+from app.pathing.incremental import IncrementalPlanner
 from app.sprites.timed_sprite import TimedSprite
+from app.graphics.animation import AnimationPlayer
 from app.graphics.pickled_image import PickledImage
 
 
@@ -19,15 +17,26 @@ class Ghost(Sprite):
         super().__init__(pos, image)
         self.new_direction = True
         self.direction = RIGHT
-        self.animation = None
+        self.animation = AnimationPlayer()
         self.action = IDLE
         self.game = game
         self.name = name
         self.mode = INIT
         self.timers = []
         self.speed = 0
-        self.dirty = 2
         self.path = []
+        self.request = None  # path being searched
+        self.goal = None  # cell the request searches a path to
+        self.planner = None  # search state kept between chase plans
+
+        # movement state: the tile last stood on, the path cell walked to,
+        # the unit step towards it, and pixels walked out of the tile
+        self.tile = None
+        self.target = None
+        self.step_x = 0
+        self.step_y = 0
+        self.offset = 0
+        self.distance = 0
 
     def is_at_home(self):
         return self.get_pos() == self.get_home_pos()
@@ -49,8 +58,7 @@ class Ghost(Sprite):
                 GOING_HOME: 'eyes-' + self.direction,
             }
             animation_name = actions[self.action]
-        self.animation = self.game.get_assets(animation_name)
-        self.animation.rewind()
+        self.animation.play(self.game.get_assets(animation_name))
 
     def redraw(self):
         self.image = self.animation.update()
@@ -59,17 +67,46 @@ class Ghost(Sprite):
         self.direction = direction
         self.change_animation()
 
-    def pathfind(self, goal_pos):
-        start = self.game.get_cell_by_pos(self.get_pos())
-        goal = self.game.get_cell_by_pos(goal_pos)
-        self.game.pathfind(self, start, goal)
+    def get_tile(self) -> GridCell:
+        if self.tile is None:
+            self.tile = self.game.get_cell_by_pos(self.get_pos())
+        return self.tile
+
+    def pathfind(self, goal_pos, planner=None):
+        self.cancel_request_()
+        self.goal = self.game.get_cell_by_pos(goal_pos)
+        self.request = self.game.request_path(self.get_tile(), self.goal, planner)
+
+    def get_planner_(self) -> IncrementalPlanner:
+        # a new planner whenever the grid changed
+        snapshot = self.game.grid.freeze()
+        if self.planner is None or self.planner.snapshot is not snapshot:
+            self.planner = IncrementalPlanner(snapshot)
+        return self.planner
+
+    def cancel_request_(self):
+        if self.request:
+            self.request.cancel()
+            self.request = None
+
+    def receive_path_(self):
+        # the ghost kept walking while the path was searched, the path
+        # is joined where the ghost is now, or on the cell it walks to,
+        # and searched again from there if it passes neither
+        path = self.request.result()
+        self.request = None
+        here = self.target if self.offset else self.get_tile()
+        if here in path:
+            self.follow_path(path[path.index(here):])
+        elif path:
+            self.request = self.game.request_path(here, self.goal)
 
     def follow_path(self, path: list[GridCell]):
         self.path = path
 
     def step_to_random_direction(self, neighbors) -> list[GridCell]:
         directions = list(neighbors.keys())
-        shuffle(directions)
+        self.game.random.shuffle(directions)
 
         for new_direction in directions:
             if new_direction == opposite_direction[self.direction]:
@@ -98,7 +135,7 @@ class Ghost(Sprite):
 
     def reset_timers(self):
         for tm in self.timers:
-            tm.active = False
+            tm.cancel()
         self.timers = []
 
     def switch_mode(self):
@@ -117,6 +154,7 @@ class Ghost(Sprite):
             return
 
         self.reset_timers()
+        self.cancel_request_()
         blink = lambda: self.change_action(BLINKING)
         self.add_timer(8000, self.switch_mode)
         self.add_timer(6500, blink)
@@ -131,70 +169,118 @@ class Ghost(Sprite):
         self.reset_timers()
         self.speed = 0
         self.path = []
+        self.cancel_request_()
+        self.tile = None
+        self.target = None
+        self.offset = 0
 
-    def update(self):
-        grid = self.game.grid
+    def restore(self):
+        super().restore()
+        self.reset()
+        self.image = self.game.get_image(self.name)
+        self.animation.stop()
+        self.new_direction = True
+        self.direction = RIGHT
 
+    def aim_(self, target: GridCell):
+        # a path cell is reached in a straight line from the tile
         x, y = self.get_pos()
-        position = pygame.math.Vector2((x, y))
-        ghost_cell = self.game.get_cell_by_pos((x, y))
-        neighbors = grid.get_neighbors(ghost_cell)
-
-        if self.path:
-            target_cell = self.path[0]
-
-            if self.new_direction:
-                for new_direction in neighbors:
-                    if neighbors[new_direction] == target_cell:
-                        self.change_direction(new_direction)
-                        self.new_direction = False
-                        break
-
-            target_x, target_y = self.game.get_cell_pos(target_cell)
-            destination = pygame.math.Vector2(target_x, target_y)
-
-            direction = destination - position
-            distance = direction.length()
-            if distance:
-                speed = min(float(self.speed), distance)
-                shift = direction.normalize() * speed
-                shift = pygame.math.Vector2([round(v) for v in shift])
-                if abs(shift.x) < abs(shift.y):
-                    shift.x = 0
+        target_x, target_y = self.game.get_cell_pos(target)
+        dx = target_x - x
+        dy = target_y - y
+        tile = self.get_tile()
+        assert not (dx and dy) and abs(tile.row - target.row) + abs(tile.col - target.col) <= 1, \
+            f'{self.name} at {(x, y)} aimed past the neighbors of its tile'
+        self.target = target
+        self.step_x = (dx > 0) - (dx < 0)
+        self.step_y = (dy > 0) - (dy < 0) if not dx else 0
+        self.offset = 0
+        self.distance = abs(dx) or abs(dy)
+
+    def arrive_(self):
+        # one tick is spent on the path cell before leaving it
+        self.tile = self.target
+        for tunnel in self.game.get_sprites_of_class(Tunnel):
+            collided = tunnel.rect.contains(self.rect)
+            if collided and tunnel.direction == self.direction:
+                self.set_pos(tunnel.exit_pos)
+                self.tile = None
+                break
+
+        self.target = None
+        self.offset = 0
+        self.new_direction = True
+        self.path.pop(0)
+
+    def walk_(self):
+        if not self.speed:
+            return  # stopped where pacman died, maybe between tiles
+        target = self.path[0]
+        if target is not self.target:
+            self.aim_(target)
+        if self.new_direction:
+            # mid-way only when the target was not a neighbor of the tile
+            cell = self.get_tile() if not self.offset else self.game.get_cell_by_pos(self.get_pos())
+            neighbors = self.game.grid.get_neighbors(cell)
+            for new_direction in neighbors:
+                if neighbors[new_direction] == target:
+                    self.change_direction(new_direction)
+                    self.new_direction = False
+                    break
+
+        remaining = self.distance - self.offset
+        if not remaining:
+            self.arrive_()
+        elif self.speed:
+            x, y = self.get_pos()
+            shift = min(self.speed, remaining)
+            self.offset += shift
+            self.set_pos((x + self.step_x * shift, y + self.step_y * shift))
+
+    def plan_(self):
+        if self.mode is FRIGHTENED:
+            if self.action is GOING_HOME:
+                if self.is_at_home():
+                    self.animate()
+                    blinky = self.game.ghosts['blinky']
+                    self.pathfind(blinky.initial_pos)
                 else:
-                    shift.y = 0
-
-                newpos = (position + shift)
-                self.set_pos(newpos)
-            else:
-                tunnels = self.game.get_sprites_of_class(Tunnel)
-                for tunnel in tunnels:
-                    collided = tunnel.rect.contains(self.rect)
-                    if collided and tunnel.direction == self.direction:
-                        self.set_pos(tunnel.exit_pos)
-                        break
+                    self.pathfind(self.get_home_pos())
+
+        elif self.mode is SCATTERING:
+            if self.is_at_home():
+                blinky = self.game.ghosts['blinky']
+                self.pathfind(blinky.initial_pos)
+
+        elif self.mode is CHASING:
+            if not self.follow_flow_():
+                planner = self.get_planner_() if self.game.use_incremental_search else None
+                self.pathfind(self.game.pacman.get_pos(), planner)
+
+    def follow_flow_(self) -> bool:
+        # the next cell towards Pacman, taken on every tile from the
+        # game's flow field, False if the game has none
+        field = self.game.get_flow_field()
+        if field is None:
+            return False
+        tile = self.get_tile()
+        i = self.game.grid.index(tile.row, tile.col)
+        step = field.next_cell(i) if i >= 0 else -1
+        if step >= 0:
+            self.follow_path([self.game.grid.cell_at(step)])
+        return True
 
-                self.new_direction = True
-                self.path.pop(0)
+    def update(self):
+        if self.request and self.request.done():
+            self.receive_path_()
 
+        if self.path:
+            self.walk_()
+            if not self.path and self.mode is CHASING:
+                self.follow_flow_()
         else:
+            neighbors = self.game.grid.get_neighbors(self.get_tile())
             self.path += self.step_to_random_direction(neighbors)
-
-            if self.mode is FRIGHTENED:
-                if self.action is GOING_HOME:
-                    if self.is_at_home():
-                        self.animate()
-                        blinky = self.game.ghosts['blinky']
-                        self.pathfind(blinky.initial_pos)
-                    else:
-                        self.pathfind(self.get_home_pos())
-
-            elif self.mode is SCATTERING:
-                if self.is_at_home():
-                    blinky = self.game.ghosts['blinky']
-                    self.pathfind(blinky.initial_pos)
-
-            elif self.mode is CHASING:
-                self.pathfind(self.game.pacman.get_pos())
+            if not self.request:  # random steps until the path arrives
+                self.plan_()
         self.redraw()
-
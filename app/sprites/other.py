@@ -16,29 +16,54 @@ class Dot(Sprite):
 
 
 class Wall(Sprite):
+    color = (0, 50, 80)
+
     def __init__(self, game, pos):
         sizes = [game.tilesize] * 2
         image = pygame.Surface(sizes)
-        image.fill((0, 50, 80))
+        self.paint(image, image.get_rect())
         super().__init__(pos, image)
 
+    @classmethod
+    def paint(cls, surface, rect):
+        surface.fill(cls.color, rect)
+
 
 class Door(Sprite):
     def __init__(self, game, pos):
         tsize = game.tilesize
         image = pygame.Surface((tsize, tsize))
-        door = pygame.Rect(0, tsize/4, tsize, tsize/2)
-        image.fill((0, 50, 80), door)
+        self.paint(image, image.get_rect())
         super().__init__(pos, image)
 
+    @classmethod
+    def paint(cls, surface, rect):
+        door = pygame.Rect(rect.x, rect.y + rect.h/4, rect.w, rect.h/2)
+        surface.fill(Wall.color, door)
+
 
 class Energizer(Sprite):
     def __init__(self, game, pos):
         image = game.get_image('energizer')
         super().__init__(pos, image)
+        self.blinker = None
         self.game = game
+        self.start_blinking()
+
+    def start_blinking(self):
+        if self.blinker:
+            self.blinker.cancel()
+        self.visible = True
+        self.blinker = self.game.every(350, self.blink)
         self.blink()
 
+    def restore(self):
+        super().restore()
+        self.start_blinking()
+
     def blink(self):
-        self.game.after_delay(350, self.blink)
-        self.visible = not self.visible
\ No newline at end of file
+        self.visible = not self.visible
+
+    def kill(self):
+        self.blinker.cancel()
+        super().kill()
\ No newline at end of file
@@ -1,7 +1,10 @@
+import math
+
 from app.sprites.other import *
 from app.pathing.directions import *
 from app.sprites.sprite import Sprite
 from app.sprites.tunnel import Tunnel
+from app.graphics.animation import AnimationPlayer
 
 
 class Pacman(Sprite):
@@ -10,44 +13,53 @@ class Pacman(Sprite):
         super().__init__(pos, image)
         self.new_direction = None
         self.direction = RIGHT
-        self.animation = None
+        self.animation = AnimationPlayer()
         self.dying = False
         self.game = game
         self.speed = 0
-        self.dirty = 2
 
     def can_move_to(self, cell, direction):
-        neighbors = self.game.grid.get_neighbors(cell)
-        return neighbors[direction].is_passable
+        return self.game.grid.is_open(cell, direction)
 
     def redraw(self):
-        if self.animation:
+        if self.animation.playing:
             self.image = self.animation.update()
 
     def kill(self):
+        # pacman stays drawn while dying, it only leaves the tile index
+        if self.tile_index:
+            self.tile_index.remove(self)
         self.dying = True
         self.change_animation()
 
     def change_animation(self):
         if self.dying:
-            self.animation = self.game.get_assets('pacman-dying-' + self.direction)
+            animation = self.game.get_assets('pacman-dying-' + self.direction)
         else:
-            self.animation = self.game.get_assets('pacman-' + self.direction)
-        self.animation.rewind()
+            animation = self.game.get_assets('pacman-' + self.direction)
+        self.animation.play(animation)
 
     def respawn(self):
         self.image = self.game.get_image('pacman')
         self.set_pos(self.initial_pos)
+        if not self.tile_index:
+            self.game.tiles.add(self)
         self.new_direction = None
         self.direction = RIGHT
-        self.animation = None
+        self.animation.stop()
         self.dying = False
         self.speed = 0
 
+    def restore(self):
+        self.respawn()
+
+    def steer(self, direction):
+        self.new_direction = direction
+
     def react(self, app, event):
         if event.type == KEYDOWN:
             if event.key in key_to_direction:
-                self.new_direction = key_to_direction[event.key]
+                self.steer(key_to_direction[event.key])
 
     def update(self):
         if self.dying:
@@ -77,19 +89,16 @@ class Pacman(Sprite):
             RIGHT: (x + self.speed, y)
         }
 
-        pacman_vec = pygame.math.Vector2((x, y))
-        for sprite in self.game.sprites.sprites():
-            sprite_pos = sprite.get_pos()
-            sprite_vec = pygame.math.Vector2(sprite_pos)
-            distance = pacman_vec.distance_to(sprite_vec)
-            collided = distance <= (tilesize / 2)
+        # sprites whose topleft is within half a tile of pacman's topleft
+        # have their centre inside this rect
+        reach = pygame.Rect(x, y, tilesize + 1, tilesize + 1)
+        for sprite in self.game.get_sprites_near(reach):
+            if sprite is self:
+                continue
 
-            if isinstance(sprite, (Door, Wall)):
-                sizes = [tilesize - self.speed] * 2
-                topleft = shift[self.direction]
-                rect = pygame.Rect(topleft, sizes)
-                if rect.colliderect(sprite.rect):
-                    shift[self.direction] = (x, y)
+            sprite_x, sprite_y = sprite.get_pos()
+            distance = math.hypot(sprite_x - x, sprite_y - y)
+            collided = distance <= (tilesize / 2)
 
             if isinstance(sprite, Tunnel):
                 if collided and sprite.direction == self.direction:
@@ -98,6 +107,11 @@ class Pacman(Sprite):
             elif collided:
                 self.game.on_collision(sprite)
 
+        sizes = [tilesize - self.speed] * 2
+        step = pygame.Rect(shift[self.direction], sizes)
+        if self.game.is_blocked(step):
+            shift[self.direction] = (x, y)
+
         if self.speed:
             x, y = shift[self.direction]
             self.set_pos((x, y))
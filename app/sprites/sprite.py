@@ -6,6 +6,7 @@ class Sprite(pygame.sprite.DirtySprite):
         self.rect = image.get_rect()
         self.rect.topleft = pos
         self.initial_pos = pos
+        self.tile_index = None
         self.image = image
 
     def get_pos(self):
@@ -13,6 +14,16 @@ class Sprite(pygame.sprite.DirtySprite):
 
     def set_pos(self, newpos):
         self.rect.topleft = newpos
+        if self.tile_index:
+            self.tile_index.move(self)
+
+    def restore(self):
+        self.set_pos(self.initial_pos)
+
+    def kill(self):
+        if self.tile_index:
+            self.tile_index.remove(self)
+        super().kill()
 
     def react(self, app, event):
         pass
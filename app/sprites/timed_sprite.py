@@ -1,4 +1,3 @@
-from app.core.timer import Timer
 from app.sprites.sprite import Sprite
 
 
@@ -6,6 +5,8 @@ class TimedSprite(Sprite):
     def __init__(self, game, pos, name, duration):
         image = game.get_image(name)
         super().__init__(pos, image)
-        self.timer = Timer(duration, self.kill)
-        self.update = self.timer.update
-        self.dirty = 2
+        self.timer = game.after_delay(duration, self.kill)
+
+    def kill(self):
+        self.timer.cancel()
+        super().kill()